@@ -0,0 +1,97 @@
+# ex: python benchmark.py
+# ex: python benchmark.py --profiles small,huge-range --save-baseline baseline.json
+# ex: python benchmark.py --baseline baseline.json --tolerance 0.2
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CUSDLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cusdle.py')
+
+PROFILES = {
+    'small': ['-n', 'john,doe', '-b', '1985-08-15', '-p', 'fluffy', '-s', '_,-,.', '--patterns', '[name][sep][0-9999]', '--mutations', '--stream'],
+    'medium': ['-n', 'john,doe,alice,bob', '-y', '1990,2000,2023', '-s', '_,-,.', '--mutations', '--advanced-mutations', '--predefined', '--smart-expand', '--padding', '!', '--stream', '--seed', '1'],
+    'huge-range': ['-n', 'john,doe', '--number-range', '0 999999', '--padding', '!', '--stream'],
+    'all-flags': ['-n', 'john,doe', '-b', '1985-08-15', '-p', 'fluffy', '-s', '_,-', '-y', '1990,2023', '--prefix', 'x', '--suffix', 'y', '--patterns', '[name][sep][year],?u[pet]?d?d', '--mutations', '--advanced-mutations', '--predefined', '--number-range', '0 9999', '--smart-expand', '--padding', '!', '--markov', '--translations', 'hola,bonjour', '--exclude', 'password', '--min-length', '4', '--max-length', '20', '--encoding', 'md5', '--stream', '--seed', '1'],
+}
+
+def run_profile(name, args, directory):
+    output = os.path.join(directory, f'{name}.out')
+    stats_path = os.path.join(directory, f'{name}.json')
+    command = [sys.executable, CUSDLE, *args, '--output', output, '--stats-json', stats_path]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    # wait4 gives the resource usage of this child alone, including its peak RSS.
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"Profile {name} failed with exit code {process.returncode}")
+
+    with open(stats_path) as f:
+        stats = json.load(f)
+    candidates = stats['stages'].get('export', {}).get('count', 0)
+    return {
+        'seconds': seconds,
+        'candidates': candidates,
+        'throughput': candidates / seconds if seconds else 0.0,
+        'peak_rss_kb': usage.ru_maxrss,
+        'output_bytes': os.path.getsize(output),
+        'stages': stats['stages'],
+    }
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if result['throughput'] < reference['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']:,.0f}/s vs {reference['throughput']:,.0f}/s")
+        if result['peak_rss_kb'] > reference['peak_rss_kb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_kb']:,} KB vs {reference['peak_rss_kb']:,} KB")
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark cusdle.py on canned input profiles.")
+
+    parser.add_argument('--profiles', type=str, default=','.join(PROFILES), help=f"Comma-separated profiles to run (default: {','.join(PROFILES)}).")
+    parser.add_argument('--baseline', type=str, help="Baseline JSON file to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown or memory growth before a regression is reported (default: 0.2).")
+    parser.add_argument('--save-baseline', type=str, help="Write the results to this JSON file for later comparisons.")
+    parser.add_argument('--stages', action='store_true', help="Also print the per-stage timings of every profile.")
+
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.profiles.split(','):
+            result = run_profile(name, PROFILES[name], directory)
+            results[name] = result
+            print(f"{name:<12}{result['candidates']:>12,} candidates{result['seconds']:>9.2f}s{result['throughput']:>12,.0f}/s{result['peak_rss_kb'] / 1024:>9.1f} MB")
+            if args.stages:
+                for stage, values in result['stages'].items():
+                    print(f"    {stage:<14}{values['count']:>12,}{values['seconds']:>9.3f}s")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
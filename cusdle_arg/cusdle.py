@@ -3,187 +3,128 @@
 # ex : python cliword.py -n "admin" --number-range "100 999" --exclude "password,123456" --size-limit 1000 --output "filtered_wordlist.txt"
 
 import argparse
-import itertools
-import random
-import hashlib
-import base64
 import json
-from collections import defaultdict
-import string
-
-COMMON_PASSWORDS = ['123456', 'password', 'qwerty', 'abc123']
-COMMON_PATTERNS = ['{0}123', '{0}2023', '123{0}', '{0}!', '{0}@']
-
-def apply_phonetic_substitutions(word):
-    subs = {'s': 'z', 'ph': 'f', 'a': '4', 'e': '3', 'i': '1', 'o': '0'}
-    for original, substitute in subs.items():
-        word = word.replace(original, substitute)
-    return word
-
-def shuffle_characters(word):
-    return ''.join(random.sample(word, len(word)))
-
-def insert_symbols(word, symbols):
-    positions = range(len(word) + 1)
-    position = random.choice(positions)
-    symbol = random.choice(symbols)
-    return word[:position] + symbol + word[position:]
-
-def generate_markov_chain_words(base_wordlist, length=8):
-    markov_chain = defaultdict(list)
-    for word in base_wordlist:
-        for i in range(len(word) - 1):
-            markov_chain[word[i]].append(word[i + 1])
-
-    generated_words = set()
-    while len(generated_words) < 100:
-        word = random.choice(list(base_wordlist))
-        new_word = word[0]
-        while len(new_word) < length:
-            next_char = random.choice(markov_chain.get(new_word[-1], string.ascii_lowercase))
-            new_word += next_char
-        generated_words.add(new_word)
-
-    return generated_words
-
-def combine_data(data, separators=None, use_years=None, prefix=None, suffix=None, custom_patterns=None):
-    base_wordlist = set()
-    for entry in data:
-        base_wordlist.add(entry)
-
-        if separators:
-            for sep in separators:
-                base_wordlist.add(f'{prefix}{sep}{entry}{suffix}' if prefix or suffix else f'{entry}')
-
-        if use_years:
-            for year in use_years:
-                base_wordlist.add(f'{entry}{year}')
-                if separators:
-                    for sep in separators:
-                        base_wordlist.add(f'{entry}{sep}{year}')
-
-        if custom_patterns:
-            for pattern in custom_patterns:
-                base_wordlist.add(pattern.replace("[name]", entry).replace("[year]", str(random.choice(use_years or []))))
-
-    return base_wordlist
-
-def apply_mutations(wordlist, advanced=False):
-    mutated_list = set()
-    for word in wordlist:
-        leetspeak_word = apply_phonetic_substitutions(word)
-        mutated_list.add(leetspeak_word)
-        if advanced:
-            mutated_list.add(word[::-1])
-            mutated_list.add(shuffle_characters(word))
-    return wordlist.union(mutated_list)
-
-def generate_wordlist(data, output_file, mutations=False, advanced_mutations=False, min_length=0, max_length=0, separators=None, years=None, prefix=None, suffix=None, predefined=False, size_limit=None, number_range=None, custom_patterns=None, smart_expand=False, padding=None, markov=False, language_translations=None, exclude=None):
-    base_wordlist = combine_data(data, separators=separators, use_years=years, prefix=prefix, suffix=suffix, custom_patterns=custom_patterns)
-
-    if mutations:
-        base_wordlist = apply_mutations(base_wordlist, advanced=advanced_mutations)
-
-    if predefined:
-        base_wordlist.update(COMMON_PASSWORDS)
-        for word in data:
-            for pattern in COMMON_PATTERNS:
-                base_wordlist.add(pattern.format(word))
-
-    if smart_expand:
-        expanded_list = set()
-        for word in base_wordlist:
-            expanded_list.add(word + random.choice(['!', '@', '#', '$', '%']))
-            expanded_list.add(word + str(random.randint(10, 99)))
-        base_wordlist.update(expanded_list)
-
-    if number_range:
-        start, end = number_range
-        for word in data:
-            for num in range(start, end + 1):
-                base_wordlist.add(word + str(num))
-                base_wordlist.add(str(num) + word)
-
-    if padding:
-        for word in list(base_wordlist):
-            base_wordlist.add(padding + word)
-            base_wordlist.add(word + padding)
-
-    if markov:
-        base_wordlist.update(generate_markov_chain_words(base_wordlist))
-
-    if language_translations:
-        for word in list(base_wordlist):
-            for translation in language_translations:
-                base_wordlist.add(translation)
-
-    if exclude:
-        base_wordlist = {word for word in base_wordlist if word not in exclude}
-
-    if min_length > 0 or max_length > 0:
-        base_wordlist = {word for word in base_wordlist if (min_length <= len(word) <= max_length)}
-
-    if size_limit and len(base_wordlist) > size_limit:
-        base_wordlist = set(random.sample(base_wordlist, size_limit))
-
-    return base_wordlist
-
-def encode_wordlist(wordlist, encoding_type):
-    encoded_list = set()
-    for word in wordlist:
-        if encoding_type == 'base64':
-            encoded_list.add(base64.b64encode(word.encode()).decode())
-        elif encoding_type == 'md5':
-            encoded_list.add(hashlib.md5(word.encode()).hexdigest())
-        elif encoding_type == 'sha256':
-            encoded_list.add(hashlib.sha256(word.encode()).hexdigest())
-    return encoded_list
-
-def export_wordlist(wordlist, output_file, format_type):
-    if format_type == 'txt':
-        with open(output_file, 'w') as f:
-            for word in wordlist:
-                f.write(word + "\n")
-    elif format_type == 'csv':
-        with open(output_file, 'w') as f:
-            f.write(",".join(wordlist))
-    elif format_type == 'json':
-        with open(output_file, 'w') as f:
-            json.dump(list(wordlist), f)
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cusdle_core import (
+    BLOOM_CAPACITY,
+    CACHE_SIZE,
+    ENCODERS,
+    MARKOV_COUNT,
+    STREAM_WINDOW,
+    CandidateStore,
+    Encode,
+    MappedLines,
+    Pipeline,
+    PipelineStats,
+    Source,
+    batch_report,
+    load_targets,
+    run_batch,
+    StageCache,
+    build_dedup,
+    detect_hash_type,
+    encode_wordlist,
+    estimate_keyspace,
+    export_wordlist,
+    generate_shards,
+    generate_wordlist,
+    iter_cracked,
+    load_markov_model,
+    load_rules,
+    load_target_hashes,
+    merge_shards,
+    ordered,
+    pattern_placeholders,
+    rank_wordlist,
+    stream_wordlist,
+    zstandard,
+)
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Generate a personalized wordlist with various options.")
     
-    parser.add_argument('-n', '--names', type=str, required=True, help="Comma-separated names of the target.")
+    parser.add_argument('-n', '--names', type=str, help="Comma-separated names of the target.")
+    parser.add_argument('--targets', type=str, help="JSONL file with one target per line: 'names', 'birthdate', 'pets', optional 'id' and 'output', and any generation option by its long name, with file paths for the file options (e.g. {\"names\": \"john,doe\", \"years\": \"1990\", \"mutations\": true, \"rules\": \"best.rule\"}). Options of the whole run (--workers, --cache, --stats, --dry-run, --crack, ...) cannot be set per target. Options given on the command line apply to every target; targets run on --workers processes.")
+    parser.add_argument('--output-dir', type=str, default='.', help="Directory of the per-target files in --targets mode when a target has no 'output' (default: current directory).")
     parser.add_argument('-b', '--birthdate', type=str, help="Birthdate of the target (yyyy-mm-dd).")
     parser.add_argument('-p', '--pets', type=str, help="Comma-separated names of pets of the target.")
     parser.add_argument('-s', '--separators', type=str, help="Comma-separated list of separators to use (e.g., '-', '_').")
     parser.add_argument('-y', '--years', type=str, help="Comma-separated list of years to include (e.g., 1990,2023).")
     parser.add_argument('--prefix', type=str, help="Custom prefix to add to each entry.")
     parser.add_argument('--suffix', type=str, help="Custom suffix to add to each entry.")
-    parser.add_argument('--patterns', type=str, help="Comma-separated list of custom patterns (e.g., '[name][year]').")
+    parser.add_argument('--patterns', type=str, help="Comma-separated list of custom patterns covering every combination of their parts: [name], [pet], [year], [sep], [birthdate], ranges like [0-99] or [a-f], masks ?l ?u ?d ?s ?a, and literal text, including any other [...] (e.g., '[name][sep][year]', '?u[name]?d?d').")
+    parser.add_argument('--dry-run', action='store_true', help="Print the keyspace size and estimated output bytes without generating anything.")
     parser.add_argument('--mutations', action='store_true', help="Apply common mutations (leetspeak, capitalization).")
     parser.add_argument('--advanced-mutations', action='store_true', help="Apply advanced mutations (reverse, case-leetspeak combos).")
+    parser.add_argument('--substitution-subsets', action='store_true', help="With --mutations, generate every combination of leetspeak substitutions instead of only the fully substituted word.")
+    parser.add_argument('--rules', type=str, help="File of hashcat/John-style rules (e.g. 'c', 'u', '$1', '^!', 'sa@', 'r') applied to every entry; rules that do not parse are skipped with a warning.")
+    parser.add_argument('--dictionary', type=str, help="Base dictionary file, one word per line, memory-mapped: every word is used as is, joined to the names with the separators, and with the years, then goes through the other stages like an entry.")
     parser.add_argument('--predefined', action='store_true', help="Include predefined common passwords and patterns.")
+    parser.add_argument('--passwords', type=str, help="With --predefined, use this password file (e.g. a leaked-password corpus, most frequent first) instead of the built-in common passwords.")
     parser.add_argument('--min-length', type=int, default=0, help="Minimum word length (default: 0 for no limit).")
     parser.add_argument('--max-length', type=int, default=0, help="Maximum word length (default: 0 for no limit).")
     parser.add_argument('--size-limit', type=int, default=0, help="Size limit for the wordlist (default: 0 for no limit).")
+    parser.add_argument('--size-mode', type=str, choices=['sample', 'first'], default='sample', help="How --size-limit picks entries: a uniform random sample in one pass, or the first entries, which stops generation early (default: sample).")
     parser.add_argument('--number-range', type=str, help="Number range to append (e.g., '100 999').")
     parser.add_argument('--smart-expand', action='store_true', help="Use smart wordlist expansion (add symbols, random numbers).")
     parser.add_argument('--padding', type=str, help="Padding to add to the start or end of each entry.")
     parser.add_argument('--markov', action='store_true', help="Use Markov chain-based word generation.")
+    parser.add_argument('--markov-order', type=int, default=1, help="Number of previous characters the Markov chain conditions on (default: 1).")
+    parser.add_argument('--markov-count', type=int, default=MARKOV_COUNT, help=f"Number of Markov words to generate (default: {MARKOV_COUNT}).")
+    parser.add_argument('--markov-length', type=int, default=8, help="Length of Markov words (default: 8, 0 to follow the length distribution of the training words).")
+    parser.add_argument('--markov-probable', action='store_true', help="Generate Markov words in descending probability instead of sampling them.")
+    parser.add_argument('--markov-corpus', type=str, help="Train the Markov chain on this file (one word per line) instead of the generated wordlist.")
+    parser.add_argument('--markov-model', type=str, help="Binary Markov model file: loaded, or written with the model trained on --markov-corpus.")
     parser.add_argument('--translations', type=str, help="Comma-separated list of additional translations for the wordlist.")
+    parser.add_argument('--translations-file', type=str, help="File of additional translations, one per line, read through mmap.")
     parser.add_argument('--exclude', type=str, help="Comma-separated list of words to exclude from the wordlist.")
-    parser.add_argument('--encoding', type=str, choices=['base64', 'md5', 'sha256'], help="Encode the wordlist (base64, md5, sha256).")
-    parser.add_argument('--format', type=str, choices=['txt', 'csv', 'json'], default='txt', help="Export format (txt, csv, json).")
+    parser.add_argument('--exclude-file', type=str, help="File of words to exclude, one per line, indexed once into a compact store.")
+    parser.add_argument('--encoding', type=str, choices=sorted(ENCODERS), help="Encode the wordlist (base64, md5, ntlm, sha1, sha256, sha512).")
+    parser.add_argument('--salt', type=str, help="Salt to add to each entry before hashing.")
+    parser.add_argument('--salt-position', type=str, choices=['prefix', 'suffix'], default='suffix', help="Where the salt goes (default: suffix).")
+    parser.add_argument('--pairs', action='store_true', help="Write 'plain:hash' pairs instead of the encoded entries alone.")
+    parser.add_argument('--crack', type=str, help="File of target hashes, one per line: hash the candidates and print the ones that match instead of writing the wordlist. The algorithm comes from --encoding or the hash length.")
+    parser.add_argument('--hash-workers', type=int, default=0, help="Encode in batches on N workers (default: 0 for the main thread).")
+    parser.add_argument('--hash-executor', type=str, choices=['thread', 'process'], default='thread', help="Worker type for --hash-workers (default: thread).")
+    parser.add_argument('--format', type=str, choices=['txt', 'csv', 'json', 'ndjson'], default='txt', help="Export format (txt, csv, json, ndjson).")
+    parser.add_argument('--compression', type=str, choices=['gzip', 'xz', 'zstd'], help="Compress the output while writing it (zstd needs the 'zstandard' package).")
     parser.add_argument('--output', type=str, default='wordlist.txt', help="Output filename (default: wordlist.txt).")
+    parser.add_argument('--seed', type=str, help="Seed for every random stage; the same inputs and seed always give the same output.")
+    parser.add_argument('--stats', action='store_true', help="Print per-stage counts, timings and the dedup ratio at the end of the run. With --workers, the generation of the shards is timed as one stage, shard_files, counting the shard files.")
+    parser.add_argument('--stats-json', type=str, help="Write the per-stage statistics to this JSON file.")
+    parser.add_argument('--stream', action='store_true', help="Generate lazily and write entries as they are produced instead of building the whole list in memory.")
+    parser.add_argument('--window', type=int, default=STREAM_WINDOW, help=f"Entries held in memory for duplicate removal in stream mode: recent entries (window) or sorted run size (exact) (default: {STREAM_WINDOW}).")
+    parser.add_argument('--dedup', type=str, choices=['window', 'exact', 'bloom', 'compact'], default='window', help="Duplicate removal in stream mode: sliding window, exact on-disk sort/merge, Bloom filter, or exact in memory with a compact store that keeps the order (default: window).")
+    parser.add_argument('--compact', action='store_true', help="Without --stream, hold the wordlist in a compact byte arena instead of a set of strings: several times less memory, entries kept in generation order.")
+    parser.add_argument('--ranked', action='store_true', help="Write entries in descending likelihood, scored by the stage that produced them (implies stream mode, ignores --workers). Memory stays flat but CPU time grows with the transforms: the stages before --rules run once more per rule, so 64 rules take several times as long as --stream.")
+    parser.add_argument('--top-k', type=int, help="Write only the K most likely entries and stop generating (implies --ranked).")
+    parser.add_argument('--workers', type=int, default=0, help="Generate in N worker processes, one shard file per partition of the input (default: 0 for a single process).")
+    parser.add_argument('--no-merge', action='store_true', help="Keep the shard files written by --workers instead of merging them into the output. Markov words, translations, exclusions, encoding and size limit are only applied when merging.")
+    parser.add_argument('--cache', type=str, help="Directory caching the output of every shard under a hash of its inputs; later runs only regenerate the shards whose inputs changed (implies --workers 1 when not set).")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE // (1024 * 1024), help=f"Size limit of the --cache directory in MB; the least recently used shards are evicted first (default: {CACHE_SIZE // (1024 * 1024)}).")
+    parser.add_argument('--bloom-capacity', type=int, default=BLOOM_CAPACITY, help=f"Expected number of entries for the Bloom filter (default: {BLOOM_CAPACITY}).")
+    parser.add_argument('--error-rate', type=float, default=0.001, help="False-positive rate of the Bloom filter (default: 0.001).")
+    parser.add_argument('--max-memory', type=int, help="Memory cap of the Bloom filter in MB.")
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.compression == 'zstd' and zstandard is None:
+        parser.error("--compression zstd requires the 'zstandard' package")
+    if not args.names and not args.targets:
+        parser.error("one of --names or --targets is required")
+    if args.cache and args.no_merge:
+        parser.error("--cache cannot be combined with --no-merge")
+    return args
 
 def main():
     args = parse_args()
 
-    data = args.names.split(',')
+    names = args.names.split(',') if args.names else []
+    data = list(names)
     if args.birthdate:
         data.append(args.birthdate)
     if args.pets:
@@ -192,36 +133,177 @@ def main():
     separators = args.separators.split(',') if args.separators else None
     years = args.years.split(',') if args.years else None
     custom_patterns = args.patterns.split(',') if args.patterns else None
+    placeholders = pattern_placeholders(data, names=names, pets=args.pets.split(',') if args.pets else None, years=years, separators=separators, birthdate=args.birthdate)
     number_range = tuple(map(int, args.number_range.split())) if args.number_range else None
     language_translations = args.translations.split(',') if args.translations else None
+    if args.translations_file:
+        language_translations = MappedLines(args.translations_file, words=language_translations or ())
     exclude = args.exclude.split(',') if args.exclude else None
+    if args.exclude_file:
+        exclude = CandidateStore(MappedLines(args.exclude_file, words=exclude or ()))
+    rules = load_rules(args.rules) if args.rules else None
+
+    markov_options = dict(
+        order=args.markov_order,
+        count=args.markov_count,
+        length=args.markov_length,
+        probable=args.markov_probable,
+        min_length=args.min_length,
+        max_length=args.max_length
+    )
+    if args.markov_corpus or args.markov_model:
+        markov_options['model'] = load_markov_model(args.markov_model, args.markov_corpus, args.markov_order)
 
-    wordlist = generate_wordlist(
-        data=data,
-        output_file=args.output,
+    options = dict(
         mutations=args.mutations,
         advanced_mutations=args.advanced_mutations,
+        substitution_subsets=args.substitution_subsets,
+        rules=rules,
         min_length=args.min_length,
         max_length=args.max_length,
         separators=separators,
         years=years,
         prefix=args.prefix,
         suffix=args.suffix,
+        dictionary=MappedLines(args.dictionary) if args.dictionary else None,
         predefined=args.predefined,
+        passwords=MappedLines(args.passwords) if args.passwords else None,
         size_limit=args.size_limit,
+        size_mode=args.size_mode,
         number_range=number_range,
         custom_patterns=custom_patterns,
+        placeholders=placeholders,
         smart_expand=args.smart_expand,
         padding=args.padding,
         markov=args.markov,
         language_translations=language_translations,
-        exclude=exclude
+        exclude=exclude,
+        seed=args.seed,
+        markov_options=markov_options,
+        stats=PipelineStats() if args.stats or args.stats_json else None
+    )
+    stats = options['stats']
+
+    encode_options = dict(
+        salt=args.salt,
+        salt_position=args.salt_position,
+        pairs=args.pairs,
+        workers=args.hash_workers,
+        executor=args.hash_executor
     )
 
-    if args.encoding:
-        wordlist = encode_wordlist(wordlist, args.encoding)
-
-    export_wordlist(wordlist, args.output, args.format)
+    if args.targets:
+        run_targets(args, options)
+        return
+
+    if args.dry_run:
+        estimate = estimate_keyspace(data, top_k=args.top_k, encoding=args.encoding, pairs=args.pairs, **options)
+        for pattern, count, size in estimate['patterns']:
+            print(f"Pattern {pattern}: {count} candidates, {size} bytes")
+        print(f"Total: {estimate['count']} candidates, about {estimate['bytes']} bytes before duplicate removal and length/exclusion filters")
+        return
+
+    dedup = None
+    ranked = args.ranked or args.top_k
+    if ranked or args.crack:
+        args.workers = 0
+        args.cache = None
+        if args.dedup == 'exact':
+            args.dedup = 'window'
+    cache = StageCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+    if cache and not args.workers:
+        args.workers = 1
+    if args.workers:
+        shards = generate_shards(data, args.output, workers=args.workers, window=args.window, cache=cache, **options)
+        if stats:
+            # The workers run outside the pipeline; the merge below only reads their files.
+            stats.lap('shard_files', shards)
+        if cache:
+            print(f"Reused {cache.hits} of {len(shards)} shards from the cache.")
+        if args.no_merge:
+            print(f"Wrote {len(shards)} shard files ({args.output}.partNNNNN).")
+            return
+    if args.stream or args.workers or ranked or args.crack:
+        max_memory = args.max_memory * 1024 * 1024 if args.max_memory else None
+        dedup = build_dedup(args.dedup, window=args.window, capacity=args.bloom_capacity, error_rate=args.error_rate, max_memory=max_memory)
+        if ranked:
+            wordlist = rank_wordlist(data, window=args.window, dedup=dedup, top_k=args.top_k, **options)
+        elif args.workers:
+            wordlist = merge_shards(shards, window=args.window, dedup=dedup, **options)
+        else:
+            wordlist = stream_wordlist(data, window=args.window, dedup=dedup, **options)
+        if args.crack:
+            targets = load_target_hashes(args.crack, args.encoding)
+            encoding = args.encoding or detect_hash_type(targets)
+            cracked = 0
+            started = time.perf_counter()
+            for word, digest in iter_cracked(wordlist, targets, encoding, salt=args.salt, salt_position=args.salt_position, workers=args.hash_workers, executor=args.hash_executor):
+                cracked += 1
+                print(f"{digest}:{word}", flush=True)
+            print(f"Cracked {cracked} of {len(targets)} hashes.")
+            if stats:
+                stats.finish('crack', time.perf_counter() - started, cracked)
+                show_stats(stats, dedup, args.stats, args.stats_json)
+            return
+        if args.encoding:
+            wordlist = Pipeline([Source(wordlist), Encode(args.encoding, **encode_options)], stats)
+    else:
+        wordlist = generate_wordlist(data=data, output_file=args.output, compact=args.compact, **options)
+        if args.encoding:
+            wordlist = encode_wordlist(wordlist, args.encoding, compact=args.compact, **encode_options)
+            if stats:
+                stats.lap('encode', wordlist)
+        wordlist = ordered(wordlist, args.seed)
+
+    started = time.perf_counter()
+    export_wordlist(wordlist, args.output, args.format, compression=args.compression)
+    if stats:
+        stats.finish('export', time.perf_counter() - started, None if args.stream or args.workers or ranked else len(wordlist))
+
+    if args.workers and not cache:
+        for path in shards:
+            os.remove(path)
+
+    if dedup is not None:
+        print(f"Removed {dedup.duplicates} duplicates ({args.dedup} dedup).")
+
+    if stats:
+        show_stats(stats, dedup, args.stats, args.stats_json)
+
+def run_targets(args, options):
+    # The rules and Markov model are loaded once and shared by every target.
+    markov_model = options['markov_options'].pop('model', None)
+    defaults = {key: value for key, value in options.items() if key not in ('rules', 'placeholders', 'stats')}
+    defaults.update(
+        encoding=args.encoding,
+        salt=args.salt,
+        salt_position=args.salt_position,
+        pairs=args.pairs,
+        hash_workers=args.hash_workers,
+        hash_executor=args.hash_executor,
+        format=args.format,
+        compression=args.compression,
+        output_dir=args.output_dir,
+        ranked=args.ranked,
+        top_k=args.top_k,
+        dedup=args.dedup,
+        window=args.window,
+        bloom_capacity=args.bloom_capacity,
+        error_rate=args.error_rate,
+        max_memory=args.max_memory
+    )
+    results = run_batch(load_targets(args.targets), defaults, workers=args.workers, rules=options['rules'], markov_model=markov_model)
+    print(batch_report(results))
+    if args.stats_json:
+        with open(args.stats_json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+def show_stats(stats, dedup, show=True, json_path=None):
+    if show:
+        print(stats.report(dedup))
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(stats.as_dict(dedup), f, indent=2)
 
 if __name__ == "__main__":
     main()
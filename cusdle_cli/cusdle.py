@@ -1,150 +1,10 @@
-import itertools
-import random
-import hashlib
-import base64
-import json
-from collections import defaultdict
-import string
-
-COMMON_PASSWORDS = ['123456', 'password', 'qwerty', 'abc123']
-COMMON_PATTERNS = ['{0}123', '{0}2023', '123{0}', '{0}!', '{0}@']
-
-def apply_phonetic_substitutions(word):
-    subs = {'s': 'z', 'ph': 'f', 'a': '4', 'e': '3', 'i': '1', 'o': '0'}
-    for original, substitute in subs.items():
-        word = word.replace(original, substitute)
-    return word
-
-def shuffle_characters(word):
-    return ''.join(random.sample(word, len(word)))
-
-def insert_symbols(word, symbols):
-    positions = range(len(word) + 1)
-    position = random.choice(positions)
-    symbol = random.choice(symbols)
-    return word[:position] + symbol + word[position:]
-
-def generate_markov_chain_words(base_wordlist, length=8):
-    markov_chain = defaultdict(list)
-    for word in base_wordlist:
-        for i in range(len(word) - 1):
-            markov_chain[word[i]].append(word[i + 1])
-
-    generated_words = set()
-    while len(generated_words) < 100:
-        word = random.choice(list(base_wordlist))
-        new_word = word[0]
-        while len(new_word) < length:
-            next_char = random.choice(markov_chain.get(new_word[-1], string.ascii_lowercase))
-            new_word += next_char
-        generated_words.add(new_word)
-
-    return generated_words
-
-def combine_data(data, separators=None, use_years=None, prefix=None, suffix=None, custom_patterns=None):
-    base_wordlist = set()
-    for entry in data:
-        base_wordlist.add(entry)
-
-        if separators:
-            for sep in separators:
-                base_wordlist.add(f'{prefix}{sep}{entry}{suffix}' if prefix or suffix else f'{entry}')
-
-        if use_years:
-            for year in use_years:
-                base_wordlist.add(f'{entry}{year}')
-                if separators:
-                    for sep in separators:
-                        base_wordlist.add(f'{entry}{sep}{year}')
-
-        if custom_patterns:
-            for pattern in custom_patterns:
-                base_wordlist.add(pattern.replace("[name]", entry).replace("[year]", str(random.choice(use_years or []))))
-
-    return base_wordlist
-
-def apply_mutations(wordlist, advanced=False):
-    mutated_list = set()
-    for word in wordlist:
-        leetspeak_word = apply_phonetic_substitutions(word)
-        mutated_list.add(leetspeak_word)
-        if advanced:
-            mutated_list.add(word[::-1])
-            mutated_list.add(shuffle_characters(word))
-    return wordlist.union(mutated_list)
-
-def generate_wordlist(data, output_file, mutations=False, advanced_mutations=False, min_length=0, max_length=0, separators=None, years=None, prefix=None, suffix=None, predefined=False, size_limit=None, number_range=None, custom_patterns=None, smart_expand=False, padding=None, markov=False, language_translations=None, exclude=None):
-    base_wordlist = combine_data(data, separators=separators, use_years=years, prefix=prefix, suffix=suffix, custom_patterns=custom_patterns)
-
-    if mutations:
-        base_wordlist = apply_mutations(base_wordlist, advanced=advanced_mutations)
-
-    if predefined:
-        base_wordlist.update(COMMON_PASSWORDS)
-        for word in data:
-            for pattern in COMMON_PATTERNS:
-                base_wordlist.add(pattern.format(word))
-
-    if smart_expand:
-        expanded_list = set()
-        for word in base_wordlist:
-            expanded_list.add(word + random.choice(['!', '@', '#', '$', '%']))
-            expanded_list.add(word + str(random.randint(10, 99)))
-        base_wordlist.update(expanded_list)
-
-    if number_range:
-        start, end = number_range
-        for word in data:
-            for num in range(start, end + 1):
-                base_wordlist.add(word + str(num))
-                base_wordlist.add(str(num) + word)
-
-    if padding:
-        for word in list(base_wordlist):
-            base_wordlist.add(padding + word)
-            base_wordlist.add(word + padding)
-
-    if markov:
-        base_wordlist.update(generate_markov_chain_words(base_wordlist))
-
-    if language_translations:
-        for word in list(base_wordlist):
-            for translation in language_translations:
-                base_wordlist.add(translation)
-
-    if exclude:
-        base_wordlist = {word for word in base_wordlist if word not in exclude}
-
-    if min_length > 0 or max_length > 0:
-        base_wordlist = {word for word in base_wordlist if (min_length <= len(word) <= max_length)}
-
-    if size_limit and len(base_wordlist) > size_limit:
-        base_wordlist = set(random.sample(base_wordlist, size_limit))
-
-    return base_wordlist
-
-def encode_wordlist(wordlist, encoding_type):
-    encoded_list = set()
-    for word in wordlist:
-        if encoding_type == 'base64':
-            encoded_list.add(base64.b64encode(word.encode()).decode())
-        elif encoding_type == 'md5':
-            encoded_list.add(hashlib.md5(word.encode()).hexdigest())
-        elif encoding_type == 'sha256':
-            encoded_list.add(hashlib.sha256(word.encode()).hexdigest())
-    return encoded_list
-
-def export_wordlist(wordlist, output_file, format_type):
-    if format_type == 'txt':
-        with open(output_file, 'w') as f:
-            for word in wordlist:
-                f.write(word + "\n")
-    elif format_type == 'csv':
-        with open(output_file, 'w') as f:
-            f.write(",".join(wordlist))
-    elif format_type == 'json':
-        with open(output_file, 'w') as f:
-            json.dump(list(wordlist), f)
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cusdle_core import Encode, Export, batch_report, load_targets, pattern_placeholders, run_batch, stream_pipeline
 
 def get_user_input():
     print("Welcome to the Advanced Personalized Wordlist Generator!")
@@ -180,9 +40,9 @@ def get_user_input():
 
     smart_expand = input("Do you want to use smart wordlist expansion (add symbols, random numbers)? (y/n): ").strip().lower() == 'y'
 
-    encoding_type = input("Do you want to encode the wordlist (base64, md5, sha256)? (leave blank for no encoding): ").strip().lower() or None
+    encoding_type = input("Do you want to encode the wordlist (base64, md5, sha1, sha256, sha512, ntlm)? (leave blank for no encoding): ").strip().lower() or None
 
-    format_type = input("In what format would you like to export the wordlist (txt, csv, json)? ").strip().lower() or "txt"
+    format_type = input("In what format would you like to export the wordlist (txt, csv, json, ndjson)? ").strip().lower() or "txt"
 
     output_file = input("Enter output filename (default: wordlist.txt): ").strip() or "wordlist.txt"
 
@@ -197,29 +57,37 @@ def get_user_input():
     return data, separators, years, prefix, suffix, custom_patterns, use_mutations, advanced_mutations, use_predefined, min_length, max_length, size_limit, number_range, smart_expand, encoding_type, format_type, output_file, padding, markov, language_translations, exclude
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate a personalized wordlist by answering prompts, or one wordlist per target of a JSONL file.")
+    parser.add_argument('targets', nargs='?', help="JSONL file with one target per line (see --targets of the command line tool) instead of the prompts.")
+    args = parser.parse_args()
+    if args.targets:
+        print(batch_report(run_batch(load_targets(args.targets), workers=os.cpu_count())))
+        return
+
     data, separators, years, prefix, suffix, custom_patterns, use_mutations, advanced_mutations, use_predefined, min_length, max_length, size_limit, number_range, smart_expand, encoding_type, format_type, output_file, padding, markov, language_translations, exclude = get_user_input()
 
-    data = [item for sublist in data for item in sublist if item]
+    names, birthdate, pets = data
+    data = [item for item in names + [birthdate] + pets if item]
 
     if not data:
         print("No data provided. Please provide at least one form of target information.")
         return
 
-    wordlist = generate_wordlist(
-        data=data, 
-        output_file=output_file, 
-        mutations=use_mutations, 
+    pipeline = stream_pipeline(
+        data=data,
+        mutations=use_mutations,
         advanced_mutations=advanced_mutations,
-        min_length=min_length, 
-        max_length=max_length, 
-        separators=separators, 
-        years=years, 
-        prefix=prefix, 
-        suffix=suffix, 
-        predefined=use_predefined, 
+        min_length=min_length,
+        max_length=max_length,
+        separators=separators,
+        years=years,
+        prefix=prefix,
+        suffix=suffix,
+        predefined=use_predefined,
         size_limit=size_limit,
         number_range=number_range,
         custom_patterns=custom_patterns,
+        placeholders=pattern_placeholders(data, names=[name for name in names if name], pets=[pet for pet in pets if pet], years=years, separators=separators, birthdate=birthdate),
         smart_expand=smart_expand,
         padding=padding,
         markov=markov,
@@ -228,9 +96,9 @@ def main():
     )
 
     if encoding_type:
-        wordlist = encode_wordlist(wordlist, encoding_type)
+        pipeline.add(Encode(encoding_type))
 
-    export_wordlist(wordlist, output_file, format_type)
+    pipeline.run(Export(output_file, format_type))
 
 if __name__ == "__main__":
     main()
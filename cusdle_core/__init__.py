@@ -0,0 +1,24 @@
+"""Wordlist generation library shared by the cusdle command line tools.
+
+Stages are composed into a lazy `Pipeline`: a source such as `Combine` feeds
+mutation, expansion, filter and encoding stages, and a sink such as `Export`
+consumes the result. `build_pipeline` gives the default order of the tools.
+"""
+
+from .batch import BATCH_DEFAULTS, batch_report, load_targets, run_batch
+from .cache import CACHE_SIZE, StageCache
+from .dedup import BLOOM_CAPACITY, STREAM_WINDOW, BloomDedup, ExternalSortDedup, WindowDedup, build_dedup
+from .encoding import ENCODED_LENGTHS, ENCODERS, detect_hash_type, encode_batch, encode_word, encode_wordlist, iter_cracked, iter_encoded, load_target_hashes, md4
+from .estimate import estimate_keyspace
+from .files import MappedLines, atomic_output, export_wordlist, iter_batches, iter_file_lines, open_output, zstandard
+from .generators import COMMON_PASSWORDS, COMMON_PATTERNS, PHONETIC_SUBSTITUTIONS, apply_mutations, apply_phonetic_substitutions, combine_data, dictionary_variants, insert_symbols, iter_substitution_subsets, shuffle_characters
+from .markov import MARKOV_COUNT, MarkovModel, generate_markov_chain_words, load_markov_model
+from .patterns import compile_pattern, iter_pattern, iter_patterns, pattern_keyspace, pattern_placeholders
+from .pipeline import Pipeline, build_pipeline, generate_wordlist, iter_wordlist, stream_pipeline, stream_wordlist
+from .ranked import iter_ranked, rank_wordlist
+from .rules import compile_rule, iter_rules, load_rules, parse_rule
+from .sampling import limit_size, ordered, reservoir_sample, stage_rng, weighted_reservoir_sample
+from .shards import generate_shards, merge_shards
+from .stages import Combine, Dedup, Dictionary, Encode, Exclude, Export, LengthFilter, Markov, Mutate, NumberRange, Padding, Predefined, Rules, SizeLimit, SmartExpand, Source, Stage, Translations
+from .stats import PipelineStats, track
+from .store import CandidateStore, as_membership
@@ -0,0 +1,219 @@
+import json
+import multiprocessing
+import operator
+import os
+import time
+
+from .dedup import BLOOM_CAPACITY, STREAM_WINDOW, build_dedup
+from .files import MappedLines, iter_file_lines
+from .markov import load_markov_model
+from .patterns import pattern_placeholders
+from .pipeline import Pipeline, stream_pipeline
+from .ranked import rank_wordlist
+from .rules import compile_rule, load_rules
+from .stages import Encode, Export, Source
+from .stats import PipelineStats
+from .store import CandidateStore
+
+# Options of every target unless its own line sets them. Target lines use the
+# command line option names, plus `names`, `birthdate`, `pets`, `output` and `id`;
+# options that are given as files on the command line (`rules`, `dictionary`,
+# `exclude-file`, ...) take paths. Options of the whole run (`targets`, `workers`,
+# `cache`, `stats`, `dry-run`, `crack`, ...) cannot be set per target.
+BATCH_DEFAULTS = dict(
+    mutations=False,
+    advanced_mutations=False,
+    substitution_subsets=False,
+    rules=None,
+    min_length=0,
+    max_length=0,
+    separators=None,
+    years=None,
+    prefix=None,
+    suffix=None,
+    dictionary=None,
+    predefined=False,
+    passwords=None,
+    size_limit=0,
+    size_mode='sample',
+    number_range=None,
+    custom_patterns=None,
+    smart_expand=False,
+    padding=None,
+    markov=False,
+    markov_corpus=None,
+    markov_model=None,
+    language_translations=None,
+    translations_file=None,
+    exclude=None,
+    exclude_file=None,
+    seed=None,
+    markov_options=None,
+    ranked=False,
+    top_k=None,
+    encoding=None,
+    salt=None,
+    salt_position='suffix',
+    pairs=False,
+    hash_workers=0,
+    hash_executor='thread',
+    format='txt',
+    compression=None,
+    output_dir='.',
+    dedup='window',
+    window=STREAM_WINDOW,
+    bloom_capacity=BLOOM_CAPACITY,
+    error_rate=0.001,
+    max_memory=None,
+)
+TARGET_KEYS = ('id', 'names', 'birthdate', 'pets', 'output')
+TARGET_ALIASES = {'patterns': 'custom_patterns', 'translations': 'language_translations'}
+MARKOV_KEYS = {'markov_order': 'order', 'markov_count': 'count', 'markov_length': 'length', 'markov_probable': 'probable'}
+LIST_OPTIONS = ('names', 'pets', 'separators', 'years', 'custom_patterns', 'language_translations', 'exclude')
+FILE_OPTIONS = ('dictionary', 'passwords')
+
+_shared = {}
+
+def _split(value):
+    if isinstance(value, str):
+        return [item for item in value.split(',') if item]
+    # JSON arrays may hold numbers, such as years.
+    return [str(item) for item in value]
+
+def load_targets(path):
+    for number, line in enumerate(iter_file_lines(path), 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path}:{number}: {error}") from None
+
+def target_options(target, defaults):
+    # Lists may be JSON arrays or comma-separated strings, as on the command line;
+    # other values, such as a default exclusion index, are used as they are. The
+    # `markov-*` settings go into `markov_options`.
+    options = dict(defaults)
+    options.update(dict.fromkeys(TARGET_KEYS))
+    markov_options = dict(options['markov_options'] or {})
+    for key, value in target.items():
+        key = key.replace('-', '_')
+        key = TARGET_ALIASES.get(key, key)
+        if key in MARKOV_KEYS:
+            markov_options[MARKOV_KEYS[key]] = value
+        elif key in options:
+            options[key] = value
+        else:
+            raise ValueError(f"Unknown target option {key!r}")
+    options['markov_options'] = dict(markov_options, min_length=options['min_length'], max_length=options['max_length'])
+    for key in LIST_OPTIONS:
+        if isinstance(options[key], (str, list)):
+            options[key] = _split(options[key]) or None
+    for key in FILE_OPTIONS:
+        if isinstance(options[key], str):
+            options[key] = MappedLines(options[key])
+    if isinstance(options['rules'], str):
+        options['rules'] = load_rules(options['rules'])
+    translations_file = options.pop('translations_file')
+    if translations_file:
+        options['language_translations'] = MappedLines(translations_file, words=options['language_translations'] or ())
+    exclude_file = options.pop('exclude_file')
+    if exclude_file:
+        options['exclude'] = CandidateStore(MappedLines(exclude_file, words=options['exclude'] or ()))
+    if isinstance(options['number_range'], str):
+        options['number_range'] = tuple(map(int, options['number_range'].split()))
+    elif options['number_range']:
+        options['number_range'] = tuple(options['number_range'])
+    return options
+
+def _init_batch(resources, defaults):
+    # Runs once per worker: the rules are compiled and the Markov model and the
+    # defaults (which may hold a large exclusion index) received here instead of
+    # once per target.
+    _shared.update(resources, defaults=defaults)
+    for rule in resources.get('rules') or ():
+        compile_rule(rule)
+
+def run_target(job):
+    index, target = job
+    started = time.perf_counter()
+    result = {'index': index, 'target': target.get('id'), 'output': None, 'count': 0, 'duplicates': 0, 'seconds': 0.0, 'error': None}
+    try:
+        options = target_options(target, _shared['defaults'])
+        names = options.pop('names') or []
+        birthdate = options.pop('birthdate')
+        pets = options.pop('pets') or []
+        data = names + ([birthdate] if birthdate else []) + pets
+        if not data:
+            raise ValueError("Target has no names, birthdate or pets")
+        result['target'] = options.pop('id') or data[0]
+
+        format_type = options.pop('format')
+        output_dir = options.pop('output_dir')
+        result['output'] = options.pop('output') or os.path.join(output_dir, f'target{index:05d}.{format_type}')
+        compression = options.pop('compression')
+        encode_options = {key: options.pop(key) for key in ('salt', 'salt_position', 'pairs')}
+        encode_options.update(workers=options.pop('hash_workers'), executor=options.pop('hash_executor'))
+        if encode_options['executor'] == 'process' and multiprocessing.current_process().daemon:
+            # Pool workers are daemonic and cannot start processes of their own.
+            encode_options['executor'] = 'thread'
+        encoding = options.pop('encoding')
+        ranked = options.pop('ranked') or options['top_k']
+        top_k = options.pop('top_k')
+        dedup_mode = options.pop('dedup')
+        if ranked and dedup_mode == 'exact':
+            # Exact dedup sorts its output, which would undo the ranking.
+            dedup_mode = 'window'
+        max_memory = options.pop('max_memory')
+        dedup = build_dedup(dedup_mode, window=options['window'], capacity=options.pop('bloom_capacity'), error_rate=options.pop('error_rate'), max_memory=max_memory * 1024 * 1024 if max_memory else None)
+
+        options['rules'] = options['rules'] or _shared.get('rules')
+        markov_corpus = options.pop('markov_corpus')
+        markov_model = options.pop('markov_model')
+        if options['markov'] and (markov_corpus or markov_model):
+            options['markov_options']['model'] = load_markov_model(markov_model, markov_corpus, options['markov_options'].get('order', 1))
+        elif options['markov'] and _shared.get('markov_model'):
+            options['markov_options']['model'] = _shared['markov_model']
+        placeholders = pattern_placeholders(data, names=names, pets=pets, years=options['years'], separators=options['separators'], birthdate=birthdate)
+
+        stats = PipelineStats()
+        if ranked:
+            pipeline = Pipeline([Source(rank_wordlist(data, dedup=dedup, top_k=top_k, placeholders=placeholders, stats=stats, **options), name='output')], stats)
+        else:
+            pipeline = stream_pipeline(data, dedup=dedup, placeholders=placeholders, stats=stats, **options)
+        if encoding:
+            pipeline.add(Encode(encoding, **encode_options))
+        pipeline.run(Export(result['output'], format_type, compression))
+
+        result['count'] = stats.stages[pipeline.stages[-1].name]['count']
+        result['duplicates'] = dedup.duplicates
+    except Exception as error:
+        # One bad target is reported in the summary instead of stopping the batch.
+        result['error'] = f'{type(error).__name__}: {error}'
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+def run_batch(targets, defaults=None, workers=0, rules=None, markov_model=None):
+    # Targets run concurrently on `workers` processes (in this process when 0) and
+    # results come back in input order.
+    resources = {'rules': rules, 'markov_model': markov_model}
+    defaults = dict(BATCH_DEFAULTS, **(defaults or {}))
+    os.makedirs(defaults['output_dir'], exist_ok=True)
+    jobs = enumerate(targets)
+    if not workers:
+        _init_batch(resources, defaults)
+        results = list(map(run_target, jobs))
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_batch, initargs=(resources, defaults)) as pool:
+            results = list(pool.imap_unordered(run_target, jobs))
+    return sorted(results, key=operator.itemgetter('index'))
+
+def batch_report(results):
+    lines = [f"{'target':<24}{'count':>14}{'dups':>10}{'seconds':>10}  output"]
+    for result in results:
+        output = result['output'] if not result['error'] else f"FAILED {result['error']}"
+        lines.append(f"{str(result['target']):<24}{result['count']:>14,}{result['duplicates']:>10,}{result['seconds']:>10.3f}  {output}")
+    failed = sum(1 for result in results if result['error'])
+    total = sum(result['count'] for result in results)
+    lines.append(f"{len(results)} targets, {total:,} entries, {failed} failed")
+    return "\n".join(lines)
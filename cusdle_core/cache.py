@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+
+CACHE_SIZE = 1024 * 1024 * 1024
+# Part of every key: bump it whenever a change to the stages alters their output.
+CACHE_VERSION = 1
+
+class StageCache:
+    # Content-addressed store of stage outputs, one file per key in `directory`.
+    # Keys hash the stage inputs and options, so a changed input simply gets a new
+    # key; hits refresh the file's mtime and eviction drops the least recently
+    # used files until the directory fits in `max_bytes`.
+    def __init__(self, directory, max_bytes=CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, *parts):
+        encoded = json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=repr)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def evict(self, keep=()):
+        keep = set(keep)
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+                total += stat.st_size
+        for mtime, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            os.remove(path)
+            total -= size
+            self.evicted += 1
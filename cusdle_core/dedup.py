@@ -0,0 +1,121 @@
+import hashlib
+import heapq
+import math
+import os
+import tempfile
+from collections import deque
+
+from .store import CandidateStore
+
+STREAM_WINDOW = 1000000
+BLOOM_CAPACITY = 10000000
+
+class WindowDedup:
+    # Drops repeats seen within the last `window` unique words; memory is O(window).
+    def __init__(self, window=STREAM_WINDOW):
+        self.window = window
+        self.duplicates = 0
+
+    def filter(self, items, key=None):
+        seen = set()
+        recent = deque()
+        for item in items:
+            word = key(item) if key else item
+            if word in seen:
+                self.duplicates += 1
+                continue
+            seen.add(word)
+            recent.append(word)
+            if len(recent) > self.window:
+                seen.discard(recent.popleft())
+            yield item
+
+class ExternalSortDedup:
+    # Exact dedup: spills sorted runs of `run_size` words to disk and merges them.
+    # Output comes out in sorted order once the whole input has been consumed.
+    # Unlike the other dedups, `filter` takes plain words and no `key`: runs are
+    # stored as text lines. Since it also reorders and holds back its output, ranked
+    # output and --crack use window dedup in its place.
+    def __init__(self, run_size=STREAM_WINDOW, tmp_dir=None):
+        self.run_size = run_size
+        self.tmp_dir = tmp_dir
+        self.duplicates = 0
+
+    def _spill(self, run, directory, runs):
+        path = os.path.join(directory, f'run{len(runs)}.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            for word in sorted(run):
+                f.write(word + "\n")
+        runs.append(path)
+
+    def _read_run(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                yield line[:-1]
+
+    def filter(self, words):
+        with tempfile.TemporaryDirectory(dir=self.tmp_dir) as directory:
+            runs = []
+            run = set()
+            count = 0
+            for word in words:
+                count += 1
+                run.add(word)
+                if len(run) >= self.run_size:
+                    # Repeats within a run are dropped by the set.
+                    self.duplicates += count - len(run)
+                    self._spill(run, directory, runs)
+                    run = set()
+                    count = 0
+
+            self.duplicates += count - len(run)
+            last = sorted(run)
+            del run
+            previous = None
+            for word in heapq.merge(last, *(self._read_run(path) for path in runs)):
+                if word == previous:
+                    self.duplicates += 1
+                    continue
+                previous = word
+                yield word
+
+class BloomDedup:
+    # Approximate dedup: a word is dropped when the filter has (probably) seen it,
+    # so a small fraction `error_rate` of unique words may be lost as well.
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=0.001, max_memory=None):
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        if max_memory:
+            size = min(size, max_memory * 8)
+        self.size = max(size, 8)
+        self.hashes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.duplicates = 0
+
+    def add(self, word):
+        digest = hashlib.blake2b(word.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        present = True
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.size
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        return not present
+
+    def filter(self, items, key=None):
+        for item in items:
+            if self.add(key(item) if key else item):
+                yield item
+            else:
+                self.duplicates += 1
+
+def build_dedup(mode='window', window=STREAM_WINDOW, capacity=BLOOM_CAPACITY, error_rate=0.001, max_memory=None):
+    if mode == 'exact':
+        return ExternalSortDedup(run_size=window)
+    elif mode == 'compact':
+        return CandidateStore()
+    elif mode == 'bloom':
+        return BloomDedup(capacity=capacity, error_rate=error_rate, max_memory=max_memory)
+    return WindowDedup(window=window)
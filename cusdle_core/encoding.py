@@ -0,0 +1,137 @@
+import base64
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .files import iter_batches, iter_file_lines
+from .store import CandidateStore
+
+ENCODE_BATCH = 10000
+ENCODED_LENGTHS = {'md5': 32, 'sha1': 40, 'sha256': 64, 'sha512': 128, 'ntlm': 32}
+
+def _md4_fallback(data):
+    # Pure Python MD4 (RFC 1320) for OpenSSL builds that no longer ship it.
+    def rotate(x, n):
+        return ((x << n) | (x >> (32 - n))) & 0xffffffff
+
+    message = bytearray(data)
+    length = (8 * len(data)) & 0xffffffffffffffff
+    message.append(0x80)
+    message.extend(b'\x00' * ((56 - len(message) % 64) % 64))
+    message.extend(length.to_bytes(8, 'little'))
+
+    state = [0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476]
+    for offset in range(0, len(message), 64):
+        x = [int.from_bytes(message[offset + i:offset + i + 4], 'little') for i in range(0, 64, 4)]
+        a, b, c, d = state
+        for i in range(16):
+            k, shift = i, (3, 7, 11, 19)[i % 4]
+            a, b, c, d = d, rotate((a + ((b & c) | (~b & d)) + x[k]) & 0xffffffff, shift), b, c
+        for i in range(16):
+            k, shift = (i % 4) * 4 + i // 4, (3, 5, 9, 13)[i % 4]
+            a, b, c, d = d, rotate((a + ((b & c) | (b & d) | (c & d)) + x[k] + 0x5a827999) & 0xffffffff, shift), b, c
+        for i in range(16):
+            k, shift = (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15)[i], (3, 9, 11, 15)[i % 4]
+            a, b, c, d = d, rotate((a + (b ^ c ^ d) + x[k] + 0x6ed9eba1) & 0xffffffff, shift), b, c
+        state = [(value + new) & 0xffffffff for value, new in zip(state, (a, b, c, d))]
+
+    return b''.join(value.to_bytes(4, 'little') for value in state)
+
+def md4(data):
+    try:
+        return hashlib.new('md4', data).digest()
+    except ValueError:
+        return _md4_fallback(data)
+
+ENCODERS = {
+    'base64': lambda word: base64.b64encode(word.encode()).decode(),
+    'md5': lambda word: hashlib.md5(word.encode()).hexdigest(),
+    'sha1': lambda word: hashlib.sha1(word.encode()).hexdigest(),
+    'sha256': lambda word: hashlib.sha256(word.encode()).hexdigest(),
+    'sha512': lambda word: hashlib.sha512(word.encode()).hexdigest(),
+    'ntlm': lambda word: md4(word.encode('utf-16le')).hex(),
+}
+
+def encode_word(word, encoding_type, salt=None, salt_position='suffix'):
+    if salt:
+        word = salt + word if salt_position == 'prefix' else word + salt
+    return ENCODERS[encoding_type](word)
+
+def encode_batch(batch, encoding_type, salt=None, salt_position='suffix', pairs=False):
+    encoder = ENCODERS[encoding_type]
+    if salt:
+        salted = [salt + word for word in batch] if salt_position == 'prefix' else [word + salt for word in batch]
+    else:
+        salted = batch
+    if pairs:
+        return [f'{word}:{encoder(value)}' for word, value in zip(batch, salted)]
+    return [encoder(value) for value in salted]
+
+def iter_batch_results(batches, function, args=(), workers=0, executor='thread', initializer=None, initargs=()):
+    if not workers:
+        if initializer:
+            initializer(*initargs)
+        for batch in batches:
+            yield from function(batch, *args)
+        return
+
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+    else:
+        if initializer:
+            initializer(*initargs)
+        pool = ThreadPoolExecutor(max_workers=workers)
+    with pool:
+        # Keep a bounded number of batches in flight and yield them in input order.
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(function, batch, *args))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def iter_encoded(words, encoding_type, salt=None, salt_position='suffix', pairs=False, workers=0, executor='thread', batch_size=ENCODE_BATCH):
+    yield from iter_batch_results(iter_batches(words, batch_size), encode_batch, (encoding_type, salt, salt_position, pairs), workers, executor)
+
+def encode_wordlist(wordlist, encoding_type, compact=False, **options):
+    collection = CandidateStore if compact else set
+    return collection(iter_encoded(wordlist, encoding_type, **options))
+
+_crack_targets = frozenset()
+
+def _set_crack_targets(targets):
+    global _crack_targets
+    _crack_targets = targets
+
+def match_batch(batch, encoding_type, salt=None, salt_position='suffix'):
+    digests = encode_batch(batch, encoding_type, salt, salt_position)
+    return [(word, digest) for word, digest in zip(batch, digests) if digest in _crack_targets]
+
+def load_target_hashes(path, encoding_type=None):
+    targets = set()
+    for line in iter_file_lines(path):
+        line = line.strip()
+        if line:
+            targets.add(line if encoding_type == 'base64' else line.lower())
+    return frozenset(targets)
+
+def detect_hash_type(targets):
+    # Hex length only tells algorithms apart up to collisions (32 is md5, not ntlm).
+    lengths = {len(target) for target in targets}
+    for name in ('md5', 'sha1', 'sha256', 'sha512'):
+        if lengths == {ENCODED_LENGTHS[name]}:
+            return name
+    raise ValueError("Cannot detect the hash type of the target file, use --encoding")
+
+def iter_cracked(words, targets, encoding_type, salt=None, salt_position='suffix', workers=0, executor='thread', batch_size=ENCODE_BATCH):
+    # Yields (plaintext, digest) matches as they are found, stopping once every
+    # target is cracked. Process workers receive the targets once, at start-up.
+    remaining = set(targets)
+    batches = iter_batches(words, batch_size)
+    for word, digest in iter_batch_results(batches, match_batch, (encoding_type, salt, salt_position), workers, executor, _set_crack_targets, (targets,)):
+        if digest in remaining:
+            remaining.discard(digest)
+            yield word, digest
+            if not remaining:
+                return
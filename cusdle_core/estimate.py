@@ -0,0 +1,76 @@
+import math
+
+from .encoding import ENCODED_LENGTHS
+from .generators import COMMON_PASSWORDS, COMMON_PATTERNS, combine_variants, dictionary_names, dictionary_variants, substitution_choices
+from .markov import MARKOV_COUNT
+from .patterns import NumberSegment, compile_pattern, pattern_keyspace, pattern_placeholders
+
+def estimate_keyspace(data, mutations=False, advanced_mutations=False, substitution_subsets=False, rules=None, separators=None, years=None, prefix=None, suffix=None, dictionary=None, predefined=False, passwords=None, size_limit=None, number_range=None, custom_patterns=None, placeholders=None, smart_expand=False, padding=None, markov=False, language_translations=None, markov_options=None, top_k=None, encoding=None, pairs=False, **unused):
+    # Counts candidates and output bytes stage by stage without generating them.
+    # Patterns, entries, number ranges and predefined words are exact; variants whose
+    # length changes (leetspeak, rules) are estimated, and duplicates are not removed.
+    entries = [word for entry in data for factor, word in combine_variants(entry, separators, years, prefix, suffix)]
+    count = len(entries)
+    chars = sum(len(word) for word in entries)
+    if dictionary is not None:
+        # One pass over the file; the variants of a word only add fixed text to it.
+        extra = [word for factor, word in dictionary_variants('', dictionary_names(data, placeholders), separators, years)]
+        for word in dictionary:
+            count += len(extra)
+            chars += len(extra) * len(word) + sum(len(part) for part in extra)
+    patterns = []
+    if custom_patterns:
+        placeholders = placeholders or pattern_placeholders(data, years=years, separators=separators)
+        for pattern in custom_patterns:
+            pattern_count, pattern_bytes = pattern_keyspace(compile_pattern(pattern, placeholders))
+            patterns.append((pattern, pattern_count, pattern_bytes))
+            count += pattern_count
+            chars += pattern_bytes - pattern_count
+
+    if mutations:
+        if substitution_subsets:
+            factor = sum(math.prod(len(choice) for choice in substitution_choices(word)) for word in entries) / max(len(entries), 1)
+        else:
+            factor = 2
+        factor += 2 if advanced_mutations else 0
+        count, chars = count * factor, chars * factor
+
+    if rules:
+        count, chars = count * (1 + len(rules)), chars * (1 + len(rules))
+
+    if predefined:
+        passwords = COMMON_PASSWORDS if passwords is None else passwords
+        count += len(passwords) + len(data) * len(COMMON_PATTERNS)
+        chars += sum(len(word) for word in passwords) + sum(len(pattern.format(word)) for word in data for pattern in COMMON_PATTERNS)
+
+    if smart_expand:
+        count, chars = count * 3, chars * 3 + count * 3
+
+    if number_range:
+        numbers = NumberSegment(*number_range)
+        count += 2 * len(data) * len(numbers)
+        chars += 2 * (len(data) * numbers.total_bytes() + len(numbers) * sum(len(word) for word in data))
+
+    if padding:
+        count, chars = count * 3, chars * 3 + count * 2 * len(padding)
+
+    if markov:
+        markov_options = markov_options or {}
+        markov_count = markov_options.get('count', MARKOV_COUNT)
+        count += markov_count
+        chars += markov_count * (markov_options.get('length') or 8)
+
+    if language_translations:
+        count += len(language_translations)
+        chars += sum(len(word) for word in language_translations)
+
+    for limit in (size_limit, top_k):
+        if limit and count > limit:
+            chars, count = chars * limit / count, limit
+
+    average = chars / count if count else 0
+    if encoding:
+        encoded = ENCODED_LENGTHS.get(encoding) or 4 * math.ceil(average / 3)
+        chars = count * (encoded + (average + 1 if pairs else 0))
+
+    return {'patterns': patterns, 'count': int(count), 'bytes': int(chars + count)}
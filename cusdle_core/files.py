@@ -0,0 +1,146 @@
+import contextlib
+import csv
+import gzip
+import itertools
+import json
+import lzma
+import mmap
+import os
+
+from .store import CandidateStore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+WRITE_BATCH = 65536
+WRITE_BUFFER = 8 * 1024 * 1024
+
+def iter_batches(words, batch_size):
+    words = iter(words)
+    while True:
+        batch = list(itertools.islice(words, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def iter_file_lines(path, errors='strict'):
+    with open(path, encoding='utf-8', errors=errors) as f:
+        for line in f:
+            yield line.rstrip('\r\n')
+
+class MappedLines:
+    # The non-empty lines of a UTF-8 file, read through mmap one line at a time, so
+    # a dictionary of millions of lines is never loaded as a whole. The instance can
+    # be iterated any number of times, also concurrently: every pass reads one
+    # shared mapping at its own offset, so a ranked walk running many passes holds
+    # a single file descriptor.
+    # `words` are yielded ahead of the file (e.g. values from the command line), and
+    # `start`/`stop` keep only the lines beginning within that byte range, so that
+    # consecutive ranges split the file on line boundaries.
+    def __init__(self, path, words=(), start=0, stop=None, errors='strict'):
+        self.path = path
+        self.words = list(words)
+        self.start = start
+        self.stop = stop
+        self.errors = errors
+        self._length = None
+        self._map = None
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(1 for line in self)
+        return self._length
+
+    def __bool__(self):
+        # Without reading the file, unlike the default of len() != 0.
+        return bool(self.words) or self.size > 0
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def __getstate__(self):
+        # Workers map the file themselves.
+        return dict(self.__dict__, _map=None)
+
+    def _mapping(self):
+        if self._map is None:
+            with open(self.path, 'rb') as f:
+                # mmap cannot map an empty file.
+                if os.fstat(f.fileno()).st_size:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def span(self, start, stop):
+        return MappedLines(self.path, start=start, stop=stop, errors=self.errors)
+
+    def __iter__(self):
+        yield from self.words
+        mm = self._mapping()
+        if mm is None:
+            return
+        end = len(mm)
+        stop = end if self.stop is None else min(self.stop, end)
+        position = self.start
+        if 0 < position < end and mm[position - 1] != 10:
+            position = mm.find(b'\n', position) + 1 or end
+        while position < stop:
+            newline = mm.find(b'\n', position)
+            if newline < 0:
+                newline = end
+            line = mm[position:newline]
+            position = newline + 1
+            if line.endswith(b'\r'):
+                line = line[:-1]
+            if line:
+                yield line.decode('utf-8', self.errors)
+
+def open_output(path, compression=None):
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    elif compression == 'xz':
+        return lzma.open(path, 'wt', encoding='utf-8', newline='')
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        return zstandard.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER)
+
+@contextlib.contextmanager
+def atomic_output(path, compression=None):
+    # Readers never see a partial file: write next to the target, then rename.
+    tmp_path = f'{path}.tmp'
+    try:
+        with open_output(tmp_path, compression) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def export_wordlist(wordlist, output_file, format_type, compression=None):
+    with atomic_output(output_file, compression) as f:
+        if format_type == 'txt' and isinstance(wordlist, CandidateStore):
+            # The arena is already newline-terminated UTF-8: one write, no strings.
+            f.flush()
+            wordlist.write_to(f.buffer)
+        elif format_type == 'txt':
+            for batch in iter_batches(wordlist, WRITE_BATCH):
+                f.write("\n".join(batch) + "\n")
+        elif format_type == 'csv':
+            writer = csv.writer(f, lineterminator="\n")
+            for batch in iter_batches(wordlist, WRITE_BATCH):
+                writer.writerows((word,) for word in batch)
+        elif format_type == 'json':
+            f.write("[")
+            separator = ""
+            for batch in iter_batches(wordlist, WRITE_BATCH):
+                f.write(separator + ", ".join(json.dumps(word) for word in batch))
+                separator = ", "
+            f.write("]")
+        elif format_type == 'ndjson':
+            for batch in iter_batches(wordlist, WRITE_BATCH):
+                f.write("\n".join(json.dumps(word) for word in batch) + "\n")
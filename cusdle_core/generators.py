@@ -0,0 +1,263 @@
+import hashlib
+import itertools
+import random
+
+from .markov import MarkovModel, generate_markov_chain_words
+from .patterns import iter_patterns, pattern_placeholders
+
+STAGE_ORDER = ['combine', 'mutations', 'rules', 'predefined', 'smart_expand', 'number_range', 'padding', 'markov', 'translations']
+
+# Relative likelihood of each kind of candidate, used by the ranked pipeline. A
+# derived candidate scores its parent's score times the factor of its stage.
+STAGE_SCORES = {
+    'separator': 0.6,
+    'year': 0.8,
+    'separator_year': 0.7,
+    'pattern': 0.9,
+    'leetspeak': 0.5,
+    'reverse': 0.2,
+    'shuffle': 0.1,
+    'rule': 0.5,
+    'common_password': 0.9,
+    'common_pattern': 0.7,
+    'symbol': 0.3,
+    'number': 0.3,
+    'number_suffix': 0.6,
+    'number_prefix': 0.4,
+    'padding_prefix': 0.3,
+    'padding_suffix': 0.4,
+    'markov': 0.1,
+    'translation': 0.5,
+    'dictionary': 0.5,
+}
+
+COMMON_PASSWORDS = ['123456', 'password', 'qwerty', 'abc123']
+COMMON_PATTERNS = ['{0}123', '{0}2023', '123{0}', '{0}!', '{0}@']
+SMART_SYMBOLS = '!@#$%'
+
+PHONETIC_SUBSTITUTIONS = {'s': 'z', 'ph': 'f', 'a': '4', 'e': '3', 'i': '1', 'o': '0'}
+PHONETIC_TABLE = str.maketrans({original: substitute for original, substitute in PHONETIC_SUBSTITUTIONS.items() if len(original) == 1})
+
+def apply_phonetic_substitutions(word):
+    # 'ph' never overlaps the single-character substitutions, so one replace
+    # plus one translate gives the same result as replacing them one by one.
+    return word.replace('ph', 'f').translate(PHONETIC_TABLE)
+
+def substitution_choices(word, subs=PHONETIC_SUBSTITUTIONS):
+    choices = []
+    i = 0
+    while i < len(word):
+        for original, substitute in subs.items():
+            if word.startswith(original, i):
+                choices.append((original, substitute))
+                i += len(original)
+                break
+        else:
+            choices.append((word[i],))
+            i += 1
+    return choices
+
+def iter_substitution_subsets(word, subs=PHONETIC_SUBSTITUTIONS):
+    # Every combination of substituted and original positions, produced lazily.
+    for combination in itertools.product(*substitution_choices(word, subs)):
+        yield ''.join(combination)
+
+def stage_key(rng):
+    # Random variants are drawn from a hash of the word under a key taken once from
+    # the stage's generator, so a word gets the same variant however often, and in
+    # whatever order or process, it is generated.
+    return rng.getrandbits(64).to_bytes(8, 'little')
+
+def word_digest(key, word, size=8):
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8', 'surrogatepass'), digest_size=size, key=key).digest(), 'little')
+
+def shuffle_characters(word, rng=random):
+    return ''.join(rng.sample(word, len(word)))
+
+def shuffle_word(key, word):
+    # Fisher-Yates drawing from one 512-bit digest, which holds the draws for words
+    # of up to 98 characters; longer words seed a generator with it instead.
+    if len(word) > 98:
+        return shuffle_characters(word, rng=random.Random(word_digest(key, word)))
+    digest = word_digest(key, word, size=64)
+    characters = list(word)
+    for i in range(len(characters) - 1, 0, -1):
+        digest, j = divmod(digest, i + 1)
+        characters[i], characters[j] = characters[j], characters[i]
+    return ''.join(characters)
+
+def insert_symbols(word, symbols, rng=random):
+    positions = range(len(word) + 1)
+    position = rng.choice(positions)
+    symbol = rng.choice(symbols)
+    return word[:position] + symbol + word[position:]
+
+# The *_variants helpers yield (score factor, word) pairs. The *_kinds helpers
+# describe a transform as one (score factor, function) pair per factor, where the
+# function yields the variants of a word with that factor. The iter_* stages drop
+# the factors and the ranked pipeline multiplies them into candidate scores.
+
+def combine_variants(entry, separators=None, use_years=None, prefix=None, suffix=None):
+    yield 1.0, entry
+
+    if separators:
+        for sep in separators:
+            yield STAGE_SCORES['separator'], f'{prefix}{sep}{entry}{suffix}' if prefix or suffix else f'{entry}'
+
+    if use_years:
+        for year in use_years:
+            yield STAGE_SCORES['year'], f'{entry}{year}'
+            if separators:
+                for sep in separators:
+                    yield STAGE_SCORES['separator_year'], f'{entry}{sep}{year}'
+
+def iter_combined(data, separators=None, use_years=None, prefix=None, suffix=None, custom_patterns=None, placeholders=None):
+    for entry in data:
+        for factor, word in combine_variants(entry, separators, use_years, prefix, suffix):
+            yield word
+
+    if custom_patterns:
+        yield from iter_patterns(custom_patterns, placeholders or pattern_placeholders(data, years=use_years, separators=separators))
+
+def dictionary_variants(word, names, separators=None, use_years=None):
+    # A dictionary word joined to every name and year with the combinators of
+    # combine_variants, scored below the target's own entries.
+    base = STAGE_SCORES['dictionary']
+    yield base, word
+
+    for name in names:
+        for sep in separators or ['']:
+            yield base * STAGE_SCORES['separator'], f'{name}{sep}{word}'
+            yield base * STAGE_SCORES['separator'], f'{word}{sep}{name}'
+
+    if use_years:
+        for year in use_years:
+            yield base * STAGE_SCORES['year'], f'{word}{year}'
+            if separators:
+                for sep in separators:
+                    yield base * STAGE_SCORES['separator_year'], f'{word}{sep}{year}'
+
+def dictionary_names(data, placeholders=None):
+    # The target's names when known, otherwise every entry.
+    return placeholders['name'] if placeholders else list(data)
+
+def iter_dictionary(words, dictionary, names, separators=None, use_years=None):
+    yield from words
+    for entry in dictionary:
+        for factor, word in dictionary_variants(entry, names, separators, use_years):
+            yield word
+
+def combine_data(data, separators=None, use_years=None, prefix=None, suffix=None, custom_patterns=None, placeholders=None):
+    return set(iter_combined(data, separators=separators, use_years=use_years, prefix=prefix, suffix=suffix, custom_patterns=custom_patterns, placeholders=placeholders))
+
+def mutation_kinds(advanced=False, subsets=False, rng=random):
+    if subsets:
+        kinds = [(STAGE_SCORES['leetspeak'], lambda word: itertools.islice(iter_substitution_subsets(word), 1, None))]
+    else:
+        kinds = [(STAGE_SCORES['leetspeak'], lambda word: (apply_phonetic_substitutions(word),))]
+    if advanced:
+        key = stage_key(rng)
+        kinds.append((STAGE_SCORES['reverse'], lambda word: (word[::-1],)))
+        kinds.append((STAGE_SCORES['shuffle'], lambda word: (shuffle_word(key, word),)))
+    return kinds
+
+def iter_mutations(words, advanced=False, subsets=False, rng=random):
+    kinds = mutation_kinds(advanced, subsets, rng)
+    for word in words:
+        yield word
+        for factor, variants in kinds:
+            yield from variants(word)
+
+def apply_mutations(wordlist, advanced=False, subsets=False, rng=random):
+    return set(iter_mutations(wordlist, advanced=advanced, subsets=subsets, rng=rng))
+
+def rule_kinds(compiled_rules):
+    return [(STAGE_SCORES['rule'] * decay(index, len(compiled_rules)), lambda word, rule=rule: (rule(word),)) for index, rule in enumerate(compiled_rules)]
+
+def decay(position, total):
+    # Earlier entries of an ordered source score higher, from 1.0 down to 0.5.
+    return 1.0 - 0.5 * position / max(total, 1)
+
+def predefined_variants(data, common_passwords=True, passwords=None):
+    # `passwords` replaces COMMON_PASSWORDS, e.g. with a leaked-password corpus in
+    # descending frequency.
+    passwords = COMMON_PASSWORDS if passwords is None else passwords
+    if common_passwords:
+        total = len(passwords)
+        for index, password in enumerate(passwords):
+            yield STAGE_SCORES['common_password'] * decay(index, total), password
+    for word in data:
+        for index, pattern in enumerate(COMMON_PATTERNS):
+            yield STAGE_SCORES['common_pattern'] * decay(index, len(COMMON_PATTERNS)), pattern.format(word)
+
+def iter_predefined(words, data, common_passwords=True, passwords=None):
+    # The passwords pass straight through: their scores would need the length of
+    # the corpus, which costs a full read of a file.
+    yield from words
+    if common_passwords:
+        yield from COMMON_PASSWORDS if passwords is None else passwords
+    for factor, word in predefined_variants(data, common_passwords=False):
+        yield word
+
+def smart_expand_words(key, word):
+    # A symbol and a number from 10 to 99, both from one digest of the word.
+    digest = word_digest(key, word)
+    return word + SMART_SYMBOLS[digest % len(SMART_SYMBOLS)], word + str(10 + digest // len(SMART_SYMBOLS) % 90)
+
+def smart_expand_kinds(rng=random):
+    key = stage_key(rng)
+    return [
+        (STAGE_SCORES['symbol'], lambda word: smart_expand_words(key, word)[:1]),
+        (STAGE_SCORES['number'], lambda word: smart_expand_words(key, word)[1:]),
+    ]
+
+def iter_smart_expand(words, rng=random):
+    key = stage_key(rng)
+    for word in words:
+        yield word
+        yield from smart_expand_words(key, word)
+
+def number_variants(word, number_range, position='suffix'):
+    start, end = number_range
+    total = end - start + 1
+    factor = STAGE_SCORES[f'number_{position}']
+    for num in range(start, end + 1):
+        yield factor * decay(num - start, total), word + str(num) if position == 'suffix' else str(num) + word
+
+def iter_number_range(words, data, number_range):
+    yield from words
+    start, end = number_range
+    for word in data:
+        for num in range(start, end + 1):
+            yield word + str(num)
+            yield str(num) + word
+
+def padding_kinds(padding):
+    return [
+        (STAGE_SCORES['padding_prefix'], lambda word: (padding + word,)),
+        (STAGE_SCORES['padding_suffix'], lambda word: (word + padding,)),
+    ]
+
+def iter_padding(words, padding):
+    for word in words:
+        yield word
+        yield padding + word
+        yield word + padding
+
+def iter_markov(words, rng=random, model=None, order=1, **options):
+    # The chain is trained on the stream as it passes; counts stay bounded by the
+    # number of distinct contexts, not by the number of words.
+    trained = model or MarkovModel(order)
+    for word in words:
+        if model is None:
+            trained.train((word,))
+        yield word
+    if trained.counts or trained.tables:
+        yield from generate_markov_chain_words((), rng=rng, model=trained, **options)
+
+def iter_translations(words, language_translations):
+    yield from words
+    yield from language_translations
+
+def within_length(word, min_length=0, max_length=0):
+    return len(word) >= min_length and (max_length <= 0 or len(word) <= max_length)
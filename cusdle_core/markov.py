@@ -0,0 +1,177 @@
+import functools
+import heapq
+import itertools
+import math
+import random
+import string
+import struct
+from array import array
+from collections import defaultdict
+
+from .files import iter_file_lines
+
+MARKOV_COUNT = 100
+MARKOV_ATTEMPTS = 20
+MARKOV_HEAP = 1000000
+MARKOV_START = '\x02'
+MARKOV_MAGIC = b'CUSDLEMK1'
+
+class MarkovModel:
+    # Order-n character model. Contexts are the previous `order` characters (padded
+    # with MARKOV_START) plus every shorter suffix for backoff; each context maps to
+    # its next characters, most frequent first, and their cumulative counts.
+    def __init__(self, order=1):
+        self.order = order
+        self.counts = defaultdict(functools.partial(defaultdict, int))
+        self.length_counts = defaultdict(int)
+        self.tables = None
+        self.lengths = None
+
+    def train(self, words):
+        padding = MARKOV_START * self.order
+        for word in words:
+            if not word:
+                continue
+            self.length_counts[len(word)] += 1
+            padded = padding + word
+            for i, char in enumerate(word):
+                context = padded[i:i + self.order]
+                for k in range(self.order + 1):
+                    self.counts[context[self.order - k:]][char] += 1
+        self.tables = None
+        return self
+
+    def compile(self):
+        if self.tables is None:
+            self.tables = {}
+            for context, followers in self.counts.items():
+                chars = ''.join(sorted(followers, key=lambda char: (-followers[char], char)))
+                self.tables[context] = (chars, array('Q', itertools.accumulate(followers[char] for char in chars)))
+            lengths = sorted(self.length_counts)
+            self.lengths = (lengths, array('Q', itertools.accumulate(self.length_counts[length] for length in lengths)))
+        return self
+
+    def table(self, prefix):
+        context = (MARKOV_START * self.order + prefix)[len(prefix):]
+        for k in range(self.order, -1, -1):
+            table = self.tables.get(context[self.order - k:])
+            if table:
+                return table
+        return (string.ascii_lowercase, array('Q', range(1, len(string.ascii_lowercase) + 1)))
+
+    def length_table(self, length=0, min_length=0, max_length=0):
+        if length:
+            return [(length, 1.0)]
+        lengths, cumulative = self.lengths
+        total = cumulative[-1] if cumulative else 0
+        previous = 0
+        result = []
+        for value, count in zip(lengths, cumulative):
+            if value >= min_length and (max_length <= 0 or value <= max_length):
+                result.append((value, (count - previous) / total))
+            previous = count
+        return result
+
+    def sample(self, rng=random, length=8):
+        word = ''
+        while len(word) < length:
+            chars, cumulative = self.table(word)
+            word += rng.choices(chars, cum_weights=cumulative)[0]
+        return word
+
+    def iter_random(self, count=MARKOV_COUNT, rng=random, length=8, min_length=0, max_length=0):
+        # Gives up after a bounded number of attempts when the model cannot
+        # produce `count` distinct words.
+        self.compile()
+        lengths = self.length_table(length, min_length, max_length)
+        if not lengths:
+            return
+        values = [value for value, probability in lengths]
+        weights = [probability for value, probability in lengths]
+        generated = set()
+        attempts = 0
+        while len(generated) < count and attempts < count * MARKOV_ATTEMPTS:
+            for target in rng.choices(values, weights=weights, k=count - len(generated)):
+                attempts += 1
+                word = self.sample(rng, target)
+                if word not in generated:
+                    generated.add(word)
+                    yield word
+
+    def iter_probable(self, count=MARKOV_COUNT, length=8, min_length=0, max_length=0, max_heap=MARKOV_HEAP):
+        # Best-first search: words come out in descending probability. The frontier
+        # is trimmed to max_heap entries, which makes very deep searches approximate.
+        self.compile()
+        heap = [(-math.log(probability), '', value) for value, probability in self.length_table(length, min_length, max_length) if probability > 0]
+        heapq.heapify(heap)
+        produced = 0
+        while heap and produced < count:
+            cost, word, target = heapq.heappop(heap)
+            if len(word) == target:
+                produced += 1
+                yield word
+                continue
+            chars, cumulative = self.table(word)
+            total = cumulative[-1]
+            previous = 0
+            for char, value in zip(chars, cumulative):
+                heapq.heappush(heap, (cost - math.log((value - previous) / total), word + char, target))
+                previous = value
+            if len(heap) > max_heap:
+                heap = heapq.nsmallest(max_heap // 2, heap)
+
+    def save(self, path):
+        self.compile()
+        with open(path, 'wb') as f:
+            f.write(MARKOV_MAGIC)
+            lengths, cumulative = self.lengths
+            f.write(struct.pack('<II', self.order, len(lengths)))
+            for value, count in zip(lengths, cumulative):
+                f.write(struct.pack('<IQ', value, count))
+            f.write(struct.pack('<I', len(self.tables)))
+            for context, (chars, cumulative) in self.tables.items():
+                encoded_context = context.encode('utf-8')
+                encoded_chars = chars.encode('utf-8')
+                f.write(struct.pack('<HH', len(encoded_context), len(encoded_chars)))
+                f.write(encoded_context)
+                f.write(encoded_chars)
+                f.write(cumulative.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MARKOV_MAGIC)) != MARKOV_MAGIC:
+                raise ValueError(f"{path} is not a Markov model file")
+            order, length_count = struct.unpack('<II', f.read(8))
+            model = cls(order)
+            lengths = []
+            cumulative = array('Q')
+            for _ in range(length_count):
+                value, count = struct.unpack('<IQ', f.read(12))
+                lengths.append(value)
+                cumulative.append(count)
+            model.lengths = (lengths, cumulative)
+            model.tables = {}
+            for _ in range(struct.unpack('<I', f.read(4))[0]):
+                context_size, chars_size = struct.unpack('<HH', f.read(4))
+                context = f.read(context_size).decode('utf-8')
+                chars = f.read(chars_size).decode('utf-8')
+                counts = array('Q')
+                counts.frombytes(f.read(len(chars) * counts.itemsize))
+                model.tables[context] = (chars, counts)
+        return model
+
+def load_markov_model(path=None, corpus=None, order=1):
+    if not corpus:
+        return MarkovModel.load(path)
+    model = MarkovModel(order).train(iter_file_lines(corpus, errors='ignore')).compile()
+    if path:
+        model.save(path)
+    return model
+
+def generate_markov_chain_words(base_wordlist, length=8, rng=random, count=MARKOV_COUNT, order=1, model=None, probable=False, min_length=0, max_length=0):
+    if model is None:
+        model = MarkovModel(order).train(base_wordlist)
+    if probable:
+        return list(model.iter_probable(count, length=length, min_length=min_length, max_length=max_length))
+    return list(model.iter_random(count, rng=rng, length=length, min_length=min_length, max_length=max_length))
@@ -0,0 +1,145 @@
+import math
+import re
+import string
+
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase,
+    'u': string.ascii_uppercase,
+    'd': string.digits,
+    's': ' ' + string.punctuation,
+    'a': string.ascii_lowercase + string.ascii_uppercase + string.digits + ' ' + string.punctuation,
+    '?': '?',
+}
+
+class NumberSegment:
+    # Lazy [start-end] range; values keep the width of `start` ([00-99] gives 00..99).
+    def __init__(self, start, end, width=0):
+        self.start = start
+        self.end = end
+        self.width = width
+
+    def __len__(self):
+        return max(0, self.end - self.start + 1)
+
+    def __getitem__(self, index):
+        return str(self.start + index).zfill(self.width)
+
+    def __iter__(self):
+        for number in range(self.start, self.end + 1):
+            yield str(number).zfill(self.width)
+
+    def total_bytes(self):
+        total = 0
+        low = self.start
+        while low <= self.end:
+            digits = max(len(str(low)), self.width)
+            high = min(self.end, 10 ** len(str(low)) - 1)
+            total += digits * (high - low + 1)
+            low = high + 1
+        return total
+
+def pattern_placeholders(data, names=None, pets=None, years=None, separators=None, birthdate=None):
+    if not years and birthdate and birthdate[:4].isdigit():
+        years = [birthdate[:4]]
+    return {
+        'name': list(names or data),
+        'pet': list(pets or []),
+        'year': list(years or []),
+        'sep': list(separators or ['']),
+        'birthdate': [birthdate] if birthdate else [],
+    }
+
+def compile_pattern(pattern, placeholders):
+    # Turns a pattern into a list of segments whose Cartesian product is the
+    # keyspace: [name], [pet], [year], [sep], [birthdate], [a-z], [0-99], ?l ?u ?d ?s ?a
+    # and literal text, which includes any other [...].
+    segments = []
+    literal = ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '?' and i + 1 < len(pattern) and pattern[i + 1] in MASK_CHARSETS:
+            if pattern[i + 1] == '?':
+                literal += '?'
+            else:
+                if literal:
+                    segments.append([literal])
+                    literal = ''
+                segments.append(list(MASK_CHARSETS[pattern[i + 1]]))
+            i += 2
+            continue
+        if char == '[' and ']' in pattern[i:]:
+            end = pattern.index(']', i)
+            name = pattern[i + 1:end]
+            numbers = re.fullmatch(r'(\d+)-(\d+)', name)
+            chars = re.fullmatch(r'(.)-(.)', name)
+            if name in placeholders:
+                segment = placeholders[name]
+            elif numbers:
+                start, stop = numbers.groups()
+                segment = NumberSegment(int(start), int(stop), len(start) if start.startswith('0') else 0)
+            elif chars:
+                segment = [chr(code) for code in range(ord(chars.group(1)), ord(chars.group(2)) + 1)]
+            else:
+                # Like an unknown mask, an unknown placeholder is literal text.
+                literal += pattern[i:end + 1]
+                i = end + 1
+                continue
+            if literal:
+                segments.append([literal])
+                literal = ''
+            segments.append(segment)
+            i = end + 1
+            continue
+        literal += char
+        i += 1
+    if literal:
+        segments.append([literal])
+    return segments
+
+def pattern_keyspace(segments):
+    # Exact number of candidates and of UTF-8 bytes (one newline each) without
+    # generating anything.
+    sizes = [len(segment) for segment in segments]
+    count = math.prod(sizes)
+    total = count
+    for index, segment in enumerate(segments):
+        if not sizes[index]:
+            return 0, 0
+        if isinstance(segment, NumberSegment):
+            segment_bytes = segment.total_bytes()
+        else:
+            segment_bytes = sum(len(value.encode('utf-8')) for value in segment)
+        total += segment_bytes * (count // sizes[index])
+    return count, total
+
+def iter_pattern(segments, start=0, stop=None):
+    # Odometer over the segments; start/stop index into the keyspace so that it
+    # can be split into deterministic chunks.
+    sizes = [len(segment) for segment in segments]
+    count = math.prod(sizes)
+    stop = count if stop is None else min(stop, count)
+    if start >= stop:
+        return
+    digits = []
+    remainder = start
+    for size in reversed(sizes):
+        digits.append(remainder % size)
+        remainder //= size
+    digits.reverse()
+    values = [segment[digit] for segment, digit in zip(segments, digits)]
+    for _ in range(stop - start):
+        yield ''.join(values)
+        position = len(sizes) - 1
+        while position >= 0:
+            digits[position] += 1
+            if digits[position] < sizes[position]:
+                values[position] = segments[position][digits[position]]
+                break
+            digits[position] = 0
+            values[position] = segments[position][0]
+            position -= 1
+
+def iter_patterns(custom_patterns, placeholders):
+    for pattern in custom_patterns:
+        yield from iter_pattern(compile_pattern(pattern, placeholders))
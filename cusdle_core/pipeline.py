@@ -0,0 +1,108 @@
+from .dedup import STREAM_WINDOW
+from .generators import dictionary_names
+from .sampling import ordered, stage_rng
+from .stages import Combine, Dedup, Dictionary, LengthFilter, Markov, Mutate, NumberRange, Padding, Predefined, Rules, Exclude, SizeLimit, SmartExpand, Translations
+from .stats import track
+from .store import CandidateStore
+
+class Pipeline:
+    # Ordered stages chained lazily: nothing is generated until the pipeline is
+    # iterated, and iterating it again runs every stage again.
+    def __init__(self, stages=(), stats=None):
+        self.stages = list(stages)
+        self.stats = stats
+
+    def index(self, name):
+        for position, stage in enumerate(self.stages):
+            if stage.name == name:
+                return position
+        raise ValueError(f"No {name!r} stage in the pipeline")
+
+    def add(self, *stages):
+        self.stages.extend(stages)
+        return self
+
+    def insert(self, stage, before):
+        self.stages.insert(self.index(before), stage)
+        return self
+
+    def remove(self, name):
+        return self.stages.pop(self.index(name))
+
+    def __iter__(self):
+        words = iter(())
+        for stage in self.stages:
+            words = stage(words)
+            if stage.name:
+                words = track(self.stats, stage.name, words)
+        return iter(words)
+
+    def run(self, sink):
+        return sink(iter(self))
+
+def final_stages(min_length=0, max_length=0, markov=False, language_translations=None, exclude=None, seed=None, markov_options=None):
+    stages = []
+    if markov:
+        stages.append(Markov(rng=stage_rng(seed, 'markov'), **(markov_options or {})))
+    if language_translations:
+        stages.append(Translations(language_translations))
+    if exclude:
+        stages.append(Exclude(exclude))
+    if min_length > 0 or max_length > 0:
+        stages.append(LengthFilter(min_length, max_length))
+    return stages
+
+def build_pipeline(data, mutations=False, advanced_mutations=False, substitution_subsets=False, rules=None, min_length=0, max_length=0, separators=None, years=None, prefix=None, suffix=None, dictionary=None, predefined=False, passwords=None, number_range=None, custom_patterns=None, placeholders=None, smart_expand=False, padding=None, markov=False, language_translations=None, exclude=None, seed=None, markov_options=None, stats=None):
+    # The stages of the command line tools in their default order.
+    pipeline = Pipeline([Combine(data, separators=separators, years=years, prefix=prefix, suffix=suffix, custom_patterns=custom_patterns, placeholders=placeholders)], stats)
+
+    if dictionary is not None:
+        pipeline.add(Dictionary(dictionary, dictionary_names(data, placeholders), separators=separators, years=years))
+
+    if mutations:
+        pipeline.add(Mutate(advanced=advanced_mutations, subsets=substitution_subsets, rng=stage_rng(seed, 'mutations')))
+
+    if rules:
+        pipeline.add(Rules(rules))
+
+    if predefined:
+        pipeline.add(Predefined(data, passwords=passwords))
+
+    if smart_expand:
+        pipeline.add(SmartExpand(rng=stage_rng(seed, 'smart_expand')))
+
+    if number_range:
+        pipeline.add(NumberRange(data, number_range))
+
+    if padding:
+        pipeline.add(Padding(padding))
+
+    return pipeline.add(*final_stages(min_length=min_length, max_length=max_length, markov=markov, language_translations=language_translations, exclude=exclude, seed=seed, markov_options=markov_options))
+
+def iter_wordlist(data, **options):
+    return iter(build_pipeline(data, **options))
+
+def stream_pipeline(data, size_limit=None, window=STREAM_WINDOW, dedup=None, size_mode='sample', **options):
+    pipeline = build_pipeline(data, **options).add(Dedup(dedup, window=window))
+    if size_limit:
+        pipeline.add(SizeLimit(size_limit, size_mode, rng=stage_rng(options.get('seed'), 'size_limit')))
+    return pipeline
+
+def stream_wordlist(data, size_limit=None, window=STREAM_WINDOW, dedup=None, size_mode='sample', **options):
+    return iter(stream_pipeline(data, size_limit=size_limit, window=window, dedup=dedup, size_mode=size_mode, **options))
+
+def generate_wordlist(data, output_file=None, size_limit=None, size_mode='sample', seed=None, stats=None, compact=False, **options):
+    # In-memory path: the same stages, each applied to the whole set produced so far.
+    # `compact` holds the set in a CandidateStore instead of a set of strings.
+    stages = build_pipeline(data, seed=seed, **options).stages
+    if size_limit:
+        stages.append(SizeLimit(size_limit, size_mode, rng=stage_rng(seed, 'size_limit')))
+
+    collection = CandidateStore if compact else set
+    base_wordlist = collection()
+    for stage in stages:
+        base_wordlist = collection(stage(ordered(base_wordlist, seed) if stage.randomized else base_wordlist))
+        if stats is not None:
+            stats.lap(stage.name, base_wordlist)
+
+    return base_wordlist
@@ -0,0 +1,124 @@
+import functools
+import heapq
+import itertools
+import operator
+
+from .dedup import STREAM_WINDOW, WindowDedup
+from .generators import STAGE_ORDER, STAGE_SCORES, combine_variants, decay, dictionary_names, dictionary_variants, mutation_kinds, number_variants, padding_kinds, predefined_variants, rule_kinds, smart_expand_kinds, within_length
+from .markov import MarkovModel, generate_markov_chain_words
+from .patterns import iter_patterns, pattern_placeholders
+from .rules import compile_rule
+from .sampling import stage_rng, weighted_reservoir_sample
+from .stats import track
+from .store import as_membership
+
+def grouped(kinds):
+    # Kinds with the same factor share one walk of the candidates before them.
+    groups = {}
+    for factor, variants in kinds:
+        groups.setdefault(factor, []).append(variants)
+    return list(groups.items())
+
+def iter_ranked(data, mutations=False, advanced_mutations=False, substitution_subsets=False, rules=None, min_length=0, max_length=0, separators=None, years=None, prefix=None, suffix=None, dictionary=None, predefined=False, passwords=None, number_range=None, custom_patterns=None, placeholders=None, smart_expand=False, padding=None, markov=False, language_translations=None, exclude=None, seed=None, markov_options=None, stats=None):
+    # Best-first merge over the stage graph, yielding (score, word) in descending
+    # score. A transform applies to every candidate of the stages before it, so
+    # each of its factors is one stream over a fresh descending walk of those
+    # candidates: a constant factor keeps the walk in order, every stream is lazy,
+    # and the merge holds one head per stream however long the list gets. The
+    # candidates under a transform are generated again for each of its distinct
+    # factors, trading CPU for memory that does not grow with the output: with N
+    # rules, the stages before them run N + 1 times.
+    transforms = []
+    if mutations:
+        transforms.append((STAGE_ORDER.index('mutations'), grouped(mutation_kinds(advanced_mutations, substitution_subsets, stage_rng(seed, 'mutations')))))
+    if rules:
+        transforms.append((STAGE_ORDER.index('rules'), grouped(rule_kinds([compile_rule(rule) for rule in rules]))))
+    if smart_expand:
+        transforms.append((STAGE_ORDER.index('smart_expand'), grouped(smart_expand_kinds(stage_rng(seed, 'smart_expand')))))
+    if padding:
+        transforms.append((STAGE_ORDER.index('padding'), grouped(padding_kinds(padding))))
+
+    # (level, function returning a descending stream); called again for every walk.
+    sources = []
+    roots = sorted((pair for entry in data for pair in combine_variants(entry, separators, years, prefix, suffix)), key=lambda pair: -pair[0])
+    sources.append((STAGE_ORDER.index('combine'), lambda: iter(roots)))
+
+    if custom_patterns:
+        pattern_values = placeholders or pattern_placeholders(data, years=years, separators=separators)
+        sources.append((STAGE_ORDER.index('combine'), lambda: ((STAGE_SCORES['pattern'], word) for word in iter_patterns(custom_patterns, pattern_values))))
+
+    if dictionary is not None:
+        # Every dictionary word has the same variants with the same factors, so one
+        # pass per factor, scored by line, is already in descending order.
+        names = dictionary_names(data, placeholders)
+        total = len(dictionary)
+
+        def dictionary_stream(kind):
+            for index, entry in enumerate(dictionary):
+                for factor, word in dictionary_variants(entry, names, separators, years):
+                    if factor == kind:
+                        yield factor * decay(index, total), word
+
+        for kind in {factor for factor, word in dictionary_variants('', names, separators, years)}:
+            sources.append((STAGE_ORDER.index('combine'), functools.partial(dictionary_stream, kind)))
+
+    if predefined:
+        # A password corpus is already in descending frequency; only the built-in
+        # passwords and the patterns are sorted.
+        common = sorted(predefined_variants(data, common_passwords=passwords is None), key=lambda pair: -pair[0])
+        sources.append((STAGE_ORDER.index('predefined'), lambda: iter(common)))
+        if passwords is not None:
+            sources.append((STAGE_ORDER.index('predefined'), lambda: predefined_variants((), passwords=passwords)))
+
+    if number_range:
+        for word in data:
+            for position in ('suffix', 'prefix'):
+                sources.append((STAGE_ORDER.index('number_range'), functools.partial(number_variants, word, number_range, position)))
+
+    if markov:
+        options = dict(markov_options or {})
+        model = options.pop('model', None) or MarkovModel(options.pop('order', 1)).train(word for score, word in roots)
+        options.pop('order', None)
+        generated = generate_markov_chain_words((), rng=stage_rng(seed, 'markov'), model=model, **options)
+        sources.append((STAGE_ORDER.index('markov'), lambda: ((STAGE_SCORES['markov'] * decay(index, len(generated)), word) for index, word in enumerate(generated))))
+
+    if language_translations:
+        sources.append((STAGE_ORDER.index('translations'), lambda: ((STAGE_SCORES['translation'], word) for word in language_translations)))
+
+    def scaled(parents, factor, group):
+        for score, word in parents:
+            for variants in group:
+                for variant in variants(word):
+                    yield score * factor, variant
+
+    def walk(limit):
+        # Every candidate of the stages before `limit`, in descending score.
+        streams = [source() for level, source in sources if level < limit]
+        for stage, kinds in transforms:
+            if stage < limit:
+                streams.extend(scaled(walk(stage), factor, group) for factor, group in kinds)
+        return heapq.merge(*streams, key=lambda pair: -pair[0])
+
+    exclude = as_membership(exclude or ())
+    for score, word in walk(len(STAGE_ORDER)):
+        if word not in exclude and (min_length <= 0 and max_length <= 0 or within_length(word, min_length, max_length)):
+            yield score, word
+
+def rank_wordlist(data, size_limit=None, window=STREAM_WINDOW, dedup=None, size_mode='sample', top_k=None, **options):
+    # Exact dedup sorts its output and would undo the ranking, so it is not used here.
+    dedup = dedup if dedup is not None else WindowDedup(window=window)
+    stats = options.get('stats')
+    scored = track(stats, 'ranked', iter_ranked(data, **options))
+    scored = track(stats, 'dedup', dedup.filter(scored, key=operator.itemgetter(1)))
+
+    if top_k:
+        scored = track(stats, 'top_k', itertools.islice(scored, top_k))
+
+    if size_limit:
+        if size_mode == 'first':
+            scored = itertools.islice(scored, size_limit)
+        else:
+            scored = weighted_reservoir_sample(scored, size_limit, operator.itemgetter(0), rng=stage_rng(options.get('seed'), 'size_limit'))
+        scored = track(stats, 'size_limit', scored)
+
+    return (word for score, word in scored)
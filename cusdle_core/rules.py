@@ -0,0 +1,167 @@
+import functools
+import string
+import sys
+
+from .encoding import ENCODE_BATCH
+from .files import iter_batches
+
+RULE_POSITIONS = string.digits + string.ascii_uppercase
+RULE_ARITY = {
+    ':': 0, 'l': 0, 'u': 0, 'c': 0, 'C': 0, 't': 0, 'r': 0, 'd': 0, 'f': 0, '{': 0, '}': 0,
+    '[': 0, ']': 0, 'q': 0, 'k': 0, 'K': 0, 'E': 0,
+    'T': 1, 'p': 1, 'D': 1, "'": 1, 'z': 1, 'Z': 1, '$': 1, '^': 1, '@': 1,
+    'x': 2, 'O': 2, 'i': 2, 'o': 2, 's': 2,
+}
+
+def _rule_position(char):
+    position = RULE_POSITIONS.find(char)
+    if position < 0:
+        raise ValueError(f"Invalid rule position: {char!r}")
+    return position
+
+def _rule_function(op, args):
+    if op == ':':
+        return None
+    elif op == 'l':
+        return str.lower
+    elif op == 'u':
+        return str.upper
+    elif op == 'c':
+        return str.capitalize
+    elif op == 'C':
+        return lambda word: word[:1].lower() + word[1:].upper()
+    elif op == 't':
+        return str.swapcase
+    elif op == 'r':
+        return lambda word: word[::-1]
+    elif op == 'd':
+        return lambda word: word + word
+    elif op == 'f':
+        return lambda word: word + word[::-1]
+    elif op == '{':
+        return lambda word: word[1:] + word[:1]
+    elif op == '}':
+        return lambda word: word[-1:] + word[:-1]
+    elif op == '[':
+        return lambda word: word[1:]
+    elif op == ']':
+        return lambda word: word[:-1]
+    elif op == 'q':
+        return lambda word: ''.join(char * 2 for char in word)
+    elif op == 'k':
+        return lambda word: word[1::-1] + word[2:] if len(word) > 1 else word
+    elif op == 'K':
+        return lambda word: word[:-2] + word[:-3:-1] if len(word) > 1 else word
+    elif op == 'E':
+        return lambda word: ' '.join(part.capitalize() for part in word.lower().split(' '))
+    elif op == '$':
+        char = args[0]
+        return lambda word: word + char
+    elif op == '^':
+        char = args[0]
+        return lambda word: char + word
+    elif op == '@':
+        char = args[0]
+        return lambda word: word.replace(char, '')
+
+    n = _rule_position(args[0])
+    if op == 'T':
+        return lambda word: word[:n] + word[n:n + 1].swapcase() + word[n + 1:]
+    elif op == 'p':
+        return lambda word: word * (n + 1)
+    elif op == 'D':
+        return lambda word: word[:n] + word[n + 1:]
+    elif op == "'":
+        return lambda word: word[:n]
+    elif op == 'z':
+        return lambda word: word[:1] * n + word
+    elif op == 'Z':
+        return lambda word: word + word[-1:] * n
+    elif op == 'i':
+        char = args[1]
+        return lambda word: word[:n] + char + word[n:] if n <= len(word) else word
+    elif op == 'o':
+        char = args[1]
+        return lambda word: word[:n] + char + word[n + 1:] if n < len(word) else word
+
+    m = _rule_position(args[1])
+    if op == 'x':
+        return lambda word: word[n:n + m]
+    elif op == 'O':
+        return lambda word: word[:n] + word[n + m:]
+
+def parse_rule(rule):
+    ops = []
+    i = 0
+    while i < len(rule):
+        op = rule[i]
+        if op == ' ':
+            i += 1
+            continue
+        if op not in RULE_ARITY:
+            raise ValueError(f"Unsupported rule function {op!r} in {rule!r}")
+        arity = RULE_ARITY[op]
+        args = rule[i + 1:i + 1 + arity]
+        if len(args) < arity:
+            raise ValueError(f"Missing argument for {op!r} in {rule!r}")
+        ops.append((op, args))
+        i += 1 + arity
+    return ops
+
+@functools.lru_cache(maxsize=None)
+def compile_rule(rule):
+    functions = []
+    table = None
+    for op, args in parse_rule(rule):
+        if op == 's':
+            # Consecutive substitutions are folded into a single translate table.
+            original, substitute = args
+            if table is None:
+                table = {}
+            for key, value in table.items():
+                if value == original:
+                    table[key] = substitute
+            table.setdefault(original, substitute)
+            continue
+        if table is not None:
+            functions.append(lambda word, table=str.maketrans(table): word.translate(table))
+            table = None
+        function = _rule_function(op, args)
+        if function is not None:
+            functions.append(function)
+    if table is not None:
+        functions.append(lambda word, table=str.maketrans(table): word.translate(table))
+
+    if not functions:
+        return lambda word: word
+    if len(functions) == 1:
+        return functions[0]
+
+    def apply(word):
+        for function in functions:
+            word = function(word)
+        return word
+    return apply
+
+def load_rules(path):
+    # Like hashcat, a rule that does not parse is skipped with a warning rather than
+    # failing the run (or a worker) halfway through.
+    rules = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if line.strip() and not line.startswith('#'):
+                try:
+                    compile_rule(line)
+                except ValueError as error:
+                    print(f"{path}:{number}: skipping rule: {error}", file=sys.stderr)
+                    continue
+                rules.append(line)
+    return rules
+
+def iter_rules(words, rules, batch_size=ENCODE_BATCH):
+    compiled = [compile_rule(rule) for rule in rules]
+    for batch in iter_batches(words, batch_size):
+        yield from batch
+        for rule in compiled:
+            yield from map(rule, batch)
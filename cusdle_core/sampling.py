@@ -0,0 +1,65 @@
+import heapq
+import itertools
+import math
+import random
+
+_MISSING = object()
+
+def stage_rng(seed, stage):
+    # One generator per stage, keyed by its name, so that stages never shift each
+    # other's random sequences. Without a seed the global generator is used.
+    if seed is None:
+        return random
+    return random.Random(f'{seed}:{stage}')
+
+def ordered(words, seed):
+    # Set iteration order changes between interpreter runs; sort when reproducing.
+    # Other collections, such as a CandidateStore, keep their insertion order.
+    return sorted(words) if seed is not None and isinstance(words, set) else words
+
+def _open_uniform(rng):
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+    return value
+
+def reservoir_sample(words, size, rng=random):
+    # Algorithm L: a single pass in O(size) memory that skips over the stream
+    # geometrically instead of drawing a random number for every word.
+    words = iter(words)
+    reservoir = list(enumerate(itertools.islice(words, size)))
+    if len(reservoir) == size and size > 0:
+        weight = math.exp(math.log(_open_uniform(rng)) / size)
+        index = size - 1
+        while weight < 1.0:
+            skip = math.floor(math.log(_open_uniform(rng)) / math.log1p(-weight))
+            index += skip + 1
+            word = next(itertools.islice(words, skip, None), _MISSING)
+            if word is _MISSING:
+                break
+            reservoir[rng.randrange(size)] = (index, word)
+            weight *= math.exp(math.log(_open_uniform(rng)) / size)
+    reservoir.sort(key=lambda item: item[0])
+    return [word for index, word in reservoir]
+
+def weighted_reservoir_sample(words, size, weight, rng=random):
+    # A-Res: keeps the `size` words with the largest u ** (1 / weight) keys.
+    heap = []
+    for index, word in enumerate(words):
+        priority = weight(word)
+        if priority <= 0:
+            continue
+        key = _open_uniform(rng) ** (1.0 / priority)
+        if len(heap) < size:
+            heapq.heappush(heap, (key, index, word))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, index, word))
+    return [word for key, index, word in sorted(heap, key=lambda item: item[1])]
+
+def limit_size(words, size_limit, mode='sample', rng=random, weight=None):
+    if mode == 'first':
+        # Stops pulling from upstream stages as soon as the limit is reached.
+        return itertools.islice(words, size_limit)
+    elif weight is not None:
+        return iter(weighted_reservoir_sample(words, size_limit, weight, rng))
+    return iter(reservoir_sample(words, size_limit, rng))
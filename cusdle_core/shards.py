@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+
+from .dedup import STREAM_WINDOW, WindowDedup
+from .files import MappedLines, atomic_output, iter_file_lines
+from .generators import COMMON_PASSWORDS
+from .patterns import compile_pattern, iter_pattern, pattern_keyspace, pattern_placeholders
+from .pipeline import Pipeline, final_stages
+from .sampling import stage_rng
+from .stages import Combine, Dedup, Dictionary, Mutate, NumberRange, Padding, Predefined, Rules, SizeLimit, SmartExpand, Source
+
+SHARD_CHUNK = 10000
+DICTIONARY_CHUNK = 1024 * 1024
+
+def iter_shard_tasks(data, dictionary=None, predefined=False, number_range=None, custom_patterns=None, placeholders=None, chunk_size=SHARD_CHUNK):
+    # The task list depends only on the inputs, never on the number of workers.
+    for entry in data:
+        yield ('entry', entry, None)
+    if isinstance(dictionary, MappedLines):
+        # Byte ranges of the file, split on line boundaries by MappedLines.span.
+        for low in range(0, dictionary.size, DICTIONARY_CHUNK):
+            yield ('dictionary', dictionary.path, (low, low + DICTIONARY_CHUNK))
+    elif dictionary is not None:
+        yield ('dictionary', None, None)
+    if custom_patterns:
+        for pattern in custom_patterns:
+            count, size = pattern_keyspace(compile_pattern(pattern, placeholders))
+            for low in range(0, count, chunk_size):
+                yield ('pattern', pattern, (low, min(low + chunk_size, count)))
+    if predefined:
+        yield ('common', None, None)
+    if number_range:
+        start, end = number_range
+        for entry in data:
+            for low in range(start, end + 1, chunk_size):
+                yield ('range', entry, (low, min(low + chunk_size - 1, end)))
+
+def iter_shard(task, mutations=False, advanced_mutations=False, substitution_subsets=False, rules=None, min_length=0, max_length=0, separators=None, years=None, prefix=None, suffix=None, dictionary=None, predefined=False, passwords=None, custom_patterns=None, placeholders=None, smart_expand=False, padding=None, seed=None, **unused):
+    # Random variants depend only on the seed and the word, so shards do not depend
+    # on scheduling and match the output of a single process.
+    kind, entry, span = task
+    seed = seed or 0
+    pipeline = Pipeline()
+    if kind in ('entry', 'pattern', 'dictionary'):
+        if kind == 'entry':
+            pipeline.add(Combine([entry], separators=separators, years=years, prefix=prefix, suffix=suffix))
+        elif kind == 'dictionary':
+            pipeline.add(Dictionary(dictionary.span(*span) if span else dictionary, placeholders['name'], separators=separators, years=years))
+        else:
+            pipeline.add(Source(iter_pattern(compile_pattern(entry, placeholders), *span)))
+        if mutations:
+            pipeline.add(Mutate(advanced=advanced_mutations, subsets=substitution_subsets, rng=stage_rng(seed, 'mutations')))
+        if rules:
+            pipeline.add(Rules(rules))
+        if predefined and kind == 'entry':
+            pipeline.add(Predefined([entry], common_passwords=False))
+    elif kind == 'common':
+        pipeline.add(Source(COMMON_PASSWORDS if passwords is None else passwords))
+    else:
+        pipeline.add(NumberRange([entry], span))
+
+    if smart_expand and kind != 'range':
+        pipeline.add(SmartExpand(rng=stage_rng(seed, 'smart_expand')))
+
+    if padding:
+        pipeline.add(Padding(padding))
+
+    return iter(pipeline.add(*final_stages(min_length=min_length, max_length=max_length)))
+
+def file_stamp(path):
+    # Files are keyed by their size and modification time rather than read again.
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def task_options(task, options):
+    # Only the options that change the output of this task, so that editing one
+    # input leaves the cache keys of the unrelated tasks intact.
+    kind = task[0]
+    names = {'min_length', 'max_length', 'padding'}
+    if kind != 'range':
+        names.update(('smart_expand', 'seed'))
+    if kind in ('entry', 'pattern', 'dictionary'):
+        names.update(('mutations', 'advanced_mutations', 'substitution_subsets', 'rules'))
+    if kind == 'entry':
+        names.update(('separators', 'years', 'prefix', 'suffix', 'predefined'))
+    elif kind == 'pattern':
+        names.add('placeholders')
+    elif kind == 'dictionary':
+        names.update(('separators', 'years'))
+    selected = {name: options.get(name) for name in names}
+    if kind == 'dictionary':
+        selected['names'] = options['placeholders']['name']
+        selected['dictionary'] = file_stamp(task[1]) if task[1] else options['dictionary']
+    elif kind == 'common':
+        passwords = options.get('passwords')
+        selected['passwords'] = file_stamp(passwords.path) if isinstance(passwords, MappedLines) else passwords
+    return selected
+
+def write_shard(job):
+    index, task, path, window, options = job
+    count = 0
+    with atomic_output(path) as f:
+        for word in WindowDedup(window=window).filter(iter_shard(task, **options)):
+            f.write(word + "\n")
+            count += 1
+    return path, count
+
+def generate_shards(data, output_file, workers=1, window=STREAM_WINDOW, cache=None, **options):
+    # With a cache, each task's shard is stored under a key of its inputs and only
+    # the tasks that are not in the cache yet are generated. Exclusions are left to
+    # the merge, so an exclusion index is never sent to the workers and editing it
+    # keeps the cached shards.
+    if (options.get('custom_patterns') or options.get('dictionary') is not None) and not options.get('placeholders'):
+        options['placeholders'] = pattern_placeholders(data, years=options.get('years'), separators=options.get('separators'))
+    tasks = iter_shard_tasks(data, dictionary=options.get('dictionary'), predefined=options.get('predefined'), number_range=options.get('number_range'), custom_patterns=options.get('custom_patterns'), placeholders=options.get('placeholders'))
+    options = {key: value for key, value in options.items() if key not in ('markov_options', 'language_translations', 'exclude', 'stats')}
+    paths = []
+    jobs = []
+    pending = set()
+    for index, task in enumerate(tasks):
+        if cache is None:
+            path = f'{output_file}.part{index:05d}'
+        else:
+            key = cache.key(task, window, task_options(task, options))
+            path = cache.path(key)
+            if path in pending or cache.get(key):
+                paths.append(path)
+                continue
+            pending.add(path)
+        paths.append(path)
+        jobs.append((index, task, path, window, options))
+
+    if jobs:
+        with multiprocessing.Pool(workers) as pool:
+            pool.map(write_shard, jobs)
+    if cache is not None:
+        cache.evict(keep=paths)
+    return paths
+
+def iter_shard_files(paths):
+    for path in paths:
+        yield from iter_file_lines(path)
+
+def merge_shards(paths, size_limit=None, window=STREAM_WINDOW, dedup=None, size_mode='sample', min_length=0, max_length=0, markov=False, language_translations=None, exclude=None, seed=None, markov_options=None, stats=None, **unused):
+    pipeline = Pipeline([Source(iter_shard_files(paths), name='shards')], stats)
+    pipeline.add(*final_stages(min_length=min_length, max_length=max_length, markov=markov, language_translations=language_translations, exclude=exclude, seed=seed or 0, markov_options=markov_options))
+    pipeline.add(Dedup(dedup, window=window))
+
+    if size_limit:
+        pipeline.add(SizeLimit(size_limit, size_mode, rng=stage_rng(seed or 0, 'size_limit')))
+
+    return iter(pipeline)
@@ -0,0 +1,211 @@
+import itertools
+import random
+
+from .dedup import STREAM_WINDOW, WindowDedup
+from .encoding import ENCODE_BATCH, iter_encoded
+from .files import export_wordlist
+from .generators import iter_combined, iter_dictionary, iter_markov, iter_mutations, iter_number_range, iter_padding, iter_predefined, iter_smart_expand, iter_translations, within_length
+from .rules import iter_rules
+from .sampling import limit_size
+from .store import as_membership
+
+# A stage maps the iterator of the stages before it to a lazy iterator. Sources
+# pass the upstream words through before their own, so any stage can start or
+# extend a pipeline. `name` labels the stage in the statistics; `randomized`
+# stages draw from a generator and are fed in sorted order when reproducing.
+
+class Stage:
+    name = None
+    randomized = False
+
+    def __call__(self, words):
+        raise NotImplementedError
+
+class Source(Stage):
+    def __init__(self, words, name=None):
+        self.words = words
+        self.name = name
+
+    def __call__(self, words):
+        # iter() now rather than on first use, so that a nested pipeline registers
+        # its statistics ahead of the stages that read from it.
+        return itertools.chain(words, iter(self.words))
+
+class Combine(Stage):
+    name = 'combine'
+
+    def __init__(self, data, separators=None, years=None, prefix=None, suffix=None, custom_patterns=None, placeholders=None):
+        self.data = data
+        self.separators = separators
+        self.years = years
+        self.prefix = prefix
+        self.suffix = suffix
+        self.custom_patterns = custom_patterns
+        self.placeholders = placeholders
+
+    def __call__(self, words):
+        return itertools.chain(words, iter_combined(self.data, separators=self.separators, use_years=self.years, prefix=self.prefix, suffix=self.suffix, custom_patterns=self.custom_patterns, placeholders=self.placeholders))
+
+class Dictionary(Stage):
+    name = 'dictionary'
+
+    def __init__(self, dictionary, names, separators=None, years=None):
+        self.dictionary = dictionary
+        self.names = names
+        self.separators = separators
+        self.years = years
+
+    def __call__(self, words):
+        return iter_dictionary(words, self.dictionary, self.names, separators=self.separators, use_years=self.years)
+
+class Mutate(Stage):
+    name = 'mutations'
+    randomized = True
+
+    def __init__(self, advanced=False, subsets=False, rng=random):
+        self.advanced = advanced
+        self.subsets = subsets
+        self.rng = rng
+
+    def __call__(self, words):
+        return iter_mutations(words, advanced=self.advanced, subsets=self.subsets, rng=self.rng)
+
+class Rules(Stage):
+    name = 'rules'
+
+    def __init__(self, rules, batch_size=ENCODE_BATCH):
+        self.rules = rules
+        self.batch_size = batch_size
+
+    def __call__(self, words):
+        return iter_rules(words, self.rules, self.batch_size)
+
+class Predefined(Stage):
+    name = 'predefined'
+
+    def __init__(self, data, common_passwords=True, passwords=None):
+        self.data = data
+        self.common_passwords = common_passwords
+        self.passwords = passwords
+
+    def __call__(self, words):
+        return iter_predefined(words, self.data, self.common_passwords, self.passwords)
+
+class SmartExpand(Stage):
+    name = 'smart_expand'
+    randomized = True
+
+    def __init__(self, rng=random):
+        self.rng = rng
+
+    def __call__(self, words):
+        return iter_smart_expand(words, rng=self.rng)
+
+class NumberRange(Stage):
+    name = 'number_range'
+
+    def __init__(self, data, number_range):
+        self.data = data
+        self.number_range = number_range
+
+    def __call__(self, words):
+        return iter_number_range(words, self.data, self.number_range)
+
+class Padding(Stage):
+    name = 'padding'
+
+    def __init__(self, padding):
+        self.padding = padding
+
+    def __call__(self, words):
+        return iter_padding(words, self.padding)
+
+class Markov(Stage):
+    name = 'markov'
+    randomized = True
+
+    def __init__(self, rng=random, **options):
+        self.rng = rng
+        self.options = options
+
+    def __call__(self, words):
+        return iter_markov(words, rng=self.rng, **self.options)
+
+class Translations(Stage):
+    name = 'translations'
+
+    def __init__(self, language_translations):
+        self.language_translations = language_translations
+
+    def __call__(self, words):
+        return iter_translations(words, self.language_translations)
+
+class Exclude(Stage):
+    name = 'exclude'
+
+    def __init__(self, exclude):
+        self.exclude = as_membership(exclude)
+
+    def __call__(self, words):
+        return (word for word in words if word not in self.exclude)
+
+class LengthFilter(Stage):
+    name = 'length'
+
+    def __init__(self, min_length=0, max_length=0):
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def __call__(self, words):
+        return (word for word in words if within_length(word, self.min_length, self.max_length))
+
+class Dedup(Stage):
+    name = 'dedup'
+
+    def __init__(self, dedup=None, window=STREAM_WINDOW):
+        self.dedup = dedup if dedup is not None else WindowDedup(window=window)
+
+    @property
+    def duplicates(self):
+        return self.dedup.duplicates
+
+    def __call__(self, words):
+        return self.dedup.filter(words)
+
+class SizeLimit(Stage):
+    name = 'size_limit'
+    randomized = True
+
+    def __init__(self, size_limit, mode='sample', rng=random, weight=None):
+        self.size_limit = size_limit
+        self.mode = mode
+        self.rng = rng
+        self.weight = weight
+
+    def __call__(self, words):
+        return limit_size(words, self.size_limit, self.mode, rng=self.rng, weight=self.weight)
+
+class Encode(Stage):
+    name = 'encode'
+
+    def __init__(self, encoding_type, salt=None, salt_position='suffix', pairs=False, workers=0, executor='thread', batch_size=ENCODE_BATCH):
+        self.encoding_type = encoding_type
+        self.salt = salt
+        self.salt_position = salt_position
+        self.pairs = pairs
+        self.workers = workers
+        self.executor = executor
+        self.batch_size = batch_size
+
+    def __call__(self, words):
+        return iter_encoded(words, self.encoding_type, salt=self.salt, salt_position=self.salt_position, pairs=self.pairs, workers=self.workers, executor=self.executor, batch_size=self.batch_size)
+
+class Export:
+    # Sink: consumes the words of a pipeline and writes them to `output_file`.
+    def __init__(self, output_file, format_type='txt', compression=None):
+        self.output_file = output_file
+        self.format_type = format_type
+        self.compression = compression
+
+    def __call__(self, words):
+        export_wordlist(words, self.output_file, self.format_type, compression=self.compression)
@@ -0,0 +1,83 @@
+import time
+
+class PipelineStats:
+    # Per-stage output counts and wall time. Streamed stages are timed around each
+    # next() call, which includes the stages upstream of them, so a stage's own time
+    # is its total minus that of the stage it reads from.
+    def __init__(self):
+        self.stages = {}
+        self.chain_end = None
+        self.started = self.last_lap = time.perf_counter()
+
+    def _stage(self, name, upstream=None):
+        if name not in self.stages:
+            self.stages[name] = {'count': 0, 'seconds': 0.0, 'upstream': upstream}
+        return self.stages[name]
+
+    def track(self, name, words):
+        # Registers the stage now, while the pipeline is being built upstream first.
+        stage = self._stage(name, self.chain_end)
+        self.chain_end = name
+        return self._timed(stage, iter(words))
+
+    def _timed(self, stage, iterator):
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                word = next(iterator)
+            except StopIteration:
+                stage['seconds'] += clock() - start
+                return
+            stage['seconds'] += clock() - start
+            stage['count'] += 1
+            yield word
+
+    def lap(self, name, words):
+        # For in-memory stages: time since the previous lap, size of the result.
+        now = time.perf_counter()
+        stage = self._stage(name)
+        stage['seconds'] += now - self.last_lap
+        stage['count'] = len(words)
+        self.last_lap = now
+
+    def finish(self, name, seconds, count=None):
+        # A stage that drives the streamed stages, e.g. export: `seconds` includes them.
+        upstream = self.chain_end
+        stage = self._stage(name, upstream)
+        stage['seconds'] += seconds
+        stage['count'] = count if count is not None else self.stages[upstream]['count'] if upstream else 0
+        self.chain_end = name
+
+    def rows(self):
+        rows = []
+        for name, stage in self.stages.items():
+            upstream = self.stages.get(stage['upstream'])
+            own = stage['seconds'] - (upstream['seconds'] if upstream else 0.0)
+            rows.append((name, stage['count'], max(own, 0.0)))
+        return rows
+
+    def as_dict(self, dedup=None):
+        result = {
+            'seconds': time.perf_counter() - self.started,
+            'stages': {name: {'count': count, 'seconds': seconds} for name, count, seconds in self.rows()},
+        }
+        if dedup is not None:
+            result['duplicates'] = dedup.duplicates
+        return result
+
+    def report(self, dedup=None):
+        lines = [f"{'stage':<14}{'count':>14}{'seconds':>10}{'per sec':>14}"]
+        for name, count, seconds in self.rows():
+            rate = f"{count / seconds:,.0f}" if seconds > 0 else '-'
+            lines.append(f"{name:<14}{count:>14,}{seconds:>10.3f}{rate:>14}")
+        if dedup is not None:
+            kept = self.stages.get('dedup', {}).get('count', 0)
+            seen = kept + dedup.duplicates
+            ratio = dedup.duplicates / seen if seen else 0.0
+            lines.append(f"dedup removed {dedup.duplicates:,} of {seen:,} ({ratio:.1%})")
+        lines.append(f"total {time.perf_counter() - self.started:.3f}s")
+        return "\n".join(lines)
+
+def track(stats, name, words):
+    return stats.track(name, words) if stats is not None else words
@@ -0,0 +1,112 @@
+import zlib
+from array import array
+
+STORE_BATCH = 65536
+
+class CandidateStore:
+    # Compact set of unique words in insertion order. Entries are packed as UTF-8,
+    # each followed by a newline, in one bytearray arena: entry i spans
+    # offsets[i]:offsets[i + 1], so the arena is already a txt wordlist. The index
+    # is an open-addressing table of entry numbers + 1 (0 is a free slot), probed
+    # linearly from the word's CRC-32, which is kept per entry so that growing the
+    # table never re-reads the arena. Unlike hash(), CRC-32 is not salted per
+    # process, so a store pickled into a worker still finds its words. Between 16
+    # and 24 bytes per word on top of the payload, against roughly 100 for a str in
+    # a set.
+    def __init__(self, words=()):
+        self.arena = bytearray()
+        self.offsets = array('Q', [0])
+        self.hashes = array('I')
+        self.slots = array('I', [0]) * 1024
+        self.duplicates = 0
+        self.update(words)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _probe(self, data, digest):
+        slots = self.slots
+        mask = len(slots) - 1
+        size = len(data) + 1
+        slot = digest & mask
+        while True:
+            entry = slots[slot]
+            if not entry:
+                return slot
+            start = self.offsets[entry - 1]
+            if self.hashes[entry - 1] == digest and self.offsets[entry] - start == size and self.arena.startswith(data, start):
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        slots = array('I', [0]) * (2 * len(self.slots))
+        mask = len(slots) - 1
+        for index, digest in enumerate(self.hashes):
+            slot = digest & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = index + 1
+        self.slots = slots
+
+    def add(self, word):
+        data = word.encode('utf-8')
+        digest = zlib.crc32(data)
+        slot = self._probe(data, digest)
+        if self.slots[slot]:
+            return False
+        self.arena += data
+        self.arena.append(10)
+        self.offsets.append(len(self.arena))
+        self.hashes.append(digest)
+        self.slots[slot] = len(self.hashes)
+        if len(self.hashes) * 3 >= len(self.slots) * 2:
+            self._grow()
+        return True
+
+    def update(self, words):
+        for word in words:
+            self.add(word)
+
+    def filter(self, items, key=None):
+        # Exact, order-preserving dedup with the interface of the other dedup classes.
+        for item in items:
+            if self.add(key(item) if key else item):
+                yield item
+            else:
+                self.duplicates += 1
+
+    def __contains__(self, word):
+        data = word.encode('utf-8')
+        return bool(self.slots[self._probe(data, zlib.crc32(data))])
+
+    def __iter__(self):
+        # Decodes a batch of entries at a time rather than slicing out every word;
+        # only a batch holding a word with a newline of its own is sliced by offsets.
+        offsets = self.offsets
+        arena = self.arena
+        for low in range(0, len(self), STORE_BATCH):
+            high = min(low + STORE_BATCH, len(self))
+            words = arena[offsets[low]:offsets[high]].decode('utf-8').split('\n')
+            if len(words) == high - low + 1:
+                yield from words[:-1]
+            else:
+                yield from (arena[offsets[i]:offsets[i + 1] - 1].decode('utf-8') for i in range(low, high))
+
+    def view(self):
+        # Newline-terminated UTF-8 of every entry. The arena cannot grow while the
+        # view is alive, so release it before adding more words.
+        return memoryview(self.arena).toreadonly()
+
+    def write_to(self, f):
+        with self.view() as view:
+            f.write(view)
+
+    @property
+    def nbytes(self):
+        return len(self.arena) + sum(len(table) * table.itemsize for table in (self.offsets, self.hashes, self.slots))
+
+def as_membership(words):
+    # Sets and stores are used as they are; any other iterable is indexed once.
+    if isinstance(words, (set, frozenset, CandidateStore)):
+        return words
+    return set(words)
@@ -0,0 +1,26 @@
+import pytest
+
+from cusdle_core import encode_word, md4
+from cusdle_core.encoding import _md4_fallback
+
+# RFC 1320, appendix A.5.
+MD4_VECTORS = [
+    (b'', '31d6cfe0d16ae931b73c59d7e0c089c0'),
+    (b'a', 'bde52cb31de33e46245e05fbdbd6fb24'),
+    (b'abc', 'a448017aaf21d8525fc10ae87aa6729d'),
+    (b'message digest', 'd9130a8164549fe818874806e1c7014b'),
+    (b'abcdefghijklmnopqrstuvwxyz', 'd79e1c308aa5bbcdeea8ed63df412da9'),
+    (b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789', '043f8582f241db351ce627e153e7f0e4'),
+    (b'1234567890' * 8, 'e33b4ddc9c38f2199c3e7b164fcc0536'),
+]
+
+@pytest.mark.parametrize('data, expected', MD4_VECTORS)
+def test_md4(data, expected):
+    assert md4(data).hex() == expected
+
+@pytest.mark.parametrize('data, expected', MD4_VECTORS)
+def test_md4_fallback(data, expected):
+    assert _md4_fallback(data).hex() == expected
+
+def test_ntlm():
+    assert encode_word('password', 'ntlm') == '8846f7eaee8fb117ad06bdd830b7586c'
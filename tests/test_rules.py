@@ -0,0 +1,36 @@
+import pytest
+
+from cusdle_core import compile_rule, load_rules, parse_rule
+
+@pytest.mark.parametrize('rule, word, expected', [
+    (':', 'abc', 'abc'),
+    ('c', 'john', 'John'),
+    ('u $1 $2', 'john', 'JOHN12'),
+    ('^! r', 'abc', 'cba!'),
+    ('T0 D1', 'john', 'Jhn'),
+    ("'2 d", 'john', 'jojo'),
+    ('i1- o0X', 'abc', 'X-bc'),
+    ('x12', 'abcd', 'bc'),
+    ('O12', 'abcd', 'ad'),
+])
+def test_compile_rule(rule, word, expected):
+    assert compile_rule(rule)(word) == expected
+
+def test_substitutions_fold_in_order():
+    # The second substitution also applies to the output of the first.
+    assert compile_rule('sab sbc')('abc') == 'ccc'
+    assert compile_rule('sab')('abc') == 'bbc'
+
+def test_parse_rule_errors():
+    with pytest.raises(ValueError):
+        parse_rule('X')
+    with pytest.raises(ValueError):
+        parse_rule('$')
+    with pytest.raises(ValueError):
+        compile_rule('T?')
+
+def test_load_rules_skips_invalid(tmp_path, capsys):
+    path = tmp_path / 'test.rule'
+    path.write_text('c\n# comment\n\nX\n$1 u\n', encoding='utf-8')
+    assert load_rules(str(path)) == ['c', '$1 u']
+    assert f'{path}:4:' in capsys.readouterr().err
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from cusdle_core import limit_size, reservoir_sample, stage_rng, weighted_reservoir_sample
+
+@pytest.mark.parametrize('total, size', [(0, 5), (3, 5), (5, 5), (1000, 10), (100000, 100)])
+def test_reservoir_size_and_order(total, size):
+    words = [f'w{i:06d}' for i in range(total)]
+    sample = reservoir_sample(iter(words), size, rng=random.Random(1))
+    assert len(sample) == min(total, size)
+    assert len(set(sample)) == len(sample)
+    # The sample keeps the order of the stream.
+    assert sample == sorted(sample)
+
+def test_reservoir_zero_size():
+    assert reservoir_sample(range(10), 0) == []
+
+def test_reservoir_is_uniform():
+    counts = [0] * 10
+    rng = random.Random(2)
+    for _ in range(5000):
+        for word in reservoir_sample(range(10), 3, rng=rng):
+            counts[word] += 1
+    assert all(1300 < count < 1700 for count in counts)
+
+def test_reservoir_seeded():
+    first = reservoir_sample(range(10000), 50, rng=stage_rng(7, 'size_limit'))
+    assert first == reservoir_sample(range(10000), 50, rng=stage_rng(7, 'size_limit'))
+    assert first != reservoir_sample(range(10000), 50, rng=stage_rng(8, 'size_limit'))
+
+def test_weighted_reservoir():
+    words = [(1.0 if i < 100 else 1e-6, i) for i in range(10000)] + [(0.0, -1)]
+    sample = weighted_reservoir_sample(words, 100, lambda pair: pair[0], rng=random.Random(3))
+    assert len(sample) == 100
+    assert [i for weight, i in sample] == sorted(i for weight, i in sample)
+    assert sum(1 for weight, i in sample if i < 100) > 95
+
+def test_limit_size_first():
+    assert list(limit_size(iter(range(100)), 5, mode='first')) == [0, 1, 2, 3, 4]
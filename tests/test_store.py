@@ -0,0 +1,36 @@
+import pickle
+
+from cusdle_core import CandidateStore
+
+def test_round_trip():
+    words = ['john', 'doe', 'john', 'jöhn', '', 'doe1']
+    store = CandidateStore(words)
+    assert list(store) == ['john', 'doe', 'jöhn', '', 'doe1']
+    assert len(store) == 5
+    assert store.duplicates == 0
+    assert 'jöhn' in store and 'jane' not in store
+    assert bytes(store.view()) == 'john\ndoe\njöhn\n\ndoe1\n'.encode('utf-8')
+
+def test_growth():
+    words = [str(i) for i in range(5000)]
+    store = CandidateStore(words + words)
+    assert list(store) == words
+    assert all(word in store for word in words)
+
+def test_newline_in_word():
+    store = CandidateStore(['a\nb', 'c', 'a\nb'])
+    assert list(store) == ['a\nb', 'c']
+
+def test_filter_counts_duplicates():
+    store = CandidateStore()
+    pairs = [(1, 'a'), (2, 'b'), (3, 'a')]
+    assert list(store.filter(pairs, key=lambda pair: pair[1])) == [(1, 'a'), (2, 'b')]
+    assert store.duplicates == 1
+
+def test_pickle():
+    # The index travels with the arena, so the copy finds its words without a rebuild.
+    store = CandidateStore(str(i) for i in range(2000))
+    copy = pickle.loads(pickle.dumps(store))
+    assert list(copy) == list(store)
+    assert '1999' in copy and '2000' not in copy
+    assert not copy.add('42') and copy.add('2000')